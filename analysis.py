@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+Analyze flow shared by the Streamlit page and the API: resolve an article
+from a URL or manual input, score it, and save it to history.
+"""
+
+import db
+import language
+import scoring
+from scrapers.dispatch import DISPATCHER
+from urls import canonical_url, normalize_netloc, strip_tracking
+
+# Below this scrapers.boilerplate quality score the extracted text is likely
+# to include page chrome, and the page suggests pasting the text instead
+LOW_EXTRACTION_QUALITY = 0.5
+
+
+def fetch_article(url="", title="", text="", pool=None, cancel=None):
+    """
+    Resolve the article to analyze.
+
+    The URL is reduced to its canonical form (urls.canonical_url, then any
+    alias resolved by an earlier scrape) before any lookup, so tracking
+    parameters, AMP and mobile links share one cache and history key. The
+    page itself is fetched from the submitted URL with only its tracking
+    parameters removed (urls.strip_tracking). A
+    URL with a verdict_cache entry is not scraped again; otherwise the
+    scraped title and text replace the manual ones. Scrapes go through the
+    per-domain limits in scrapers.dispatch; with a workers.WorkerPool the
+    page is fetched here and parsed in a worker process. Setting the
+    optional cancel event stops the scrape before the page is parsed.
+
+    Returns:
+        Dict: {"url", "domain", "title", "text", "cached", "stale", "quality"}
+        where url is the canonical URL, cached is the verdict_cache row or
+        None (text is then the cached text), stale is True when the site is failing and a previously
+        scraped copy was used, and quality is the scraper's 0-1 extraction
+        quality (None when nothing was scraped)
+
+    Raises:
+        ValueError: If the URL has no host, or the scraper finds no content
+        requests.RequestException: If the page cannot be fetched (including
+            scrapers.dispatch.DomainUnavailable when the site is failing)
+        scrapers.dispatch.ScrapeCancelled: If cancel was set
+    """
+    submitted = strip_tracking(url)
+    url = canonical_url(url)
+    if url:
+        url = db.get_url_aliases([url]).get(url, url)
+    article = {
+        "url": url,
+        "domain": normalize_netloc(url),
+        "title": (title or "").strip(),
+        "text": (text or "").strip(),
+        "cached": None,
+        "stale": False,
+        "quality": None,
+    }
+    if not url:
+        return article
+    if not article["domain"]:
+        raise ValueError("Invalid article URL")
+
+    cached = db.get_cached_verdict(url)
+    if cached:
+        article["title"] = cached[0]
+        article["text"] = cached[4] or article["text"]
+        article["cached"] = cached
+        return article
+
+    data = DISPATCHER.scrape(submitted, article["domain"], pool, cancel)
+    resolved = data.get("url", url)
+    if resolved != url:
+        db.save_url_aliases([(url, resolved)])
+        article["url"] = resolved
+        article["domain"] = normalize_netloc(resolved)
+        article["cached"] = db.get_cached_verdict(resolved)
+    article["title"] = data.get("title", article["title"])
+    article["text"] = data.get("text", article["text"])
+    article["stale"] = data.get("stale", False)
+    article["quality"] = data.get("quality")
+    return article
+
+
+def score_articles(models, articles, domain_index=None, pool=None):
+    """
+    Score resolved articles, batching everything that needs the models
+    (in a worker process when a workers.WorkerPool is given).
+
+    Each article is routed by language.detect(): English goes to models,
+    other languages to their bundle from language.load_bundle(), and
+    languages without one get language.unsupported_result().
+
+    Each result is a scoring.build_results() entry plus "language" and
+    "source": "cache" (pre-scored by the crawler), "reputation" (known
+    domain, see DomainIndex.short_circuit), "model" or "unsupported".
+    Model results also carry "index_verdict", the verdict without the
+    domain index's learned shifts.
+    """
+    results = [None] * len(articles)
+    pending = {}
+    for i, article in enumerate(articles):
+        lang, result = _route(article, domain_index)
+        if result:
+            results[i] = result
+        else:
+            pending.setdefault(lang, []).append(i)
+
+    for lang, indices in pending.items():
+        if lang == language.ENGLISH:
+            scored = _score_group(models, articles, indices, domain_index, pool)
+        else:
+            bundle = language.load_bundle(lang)
+            if bundle is None:
+                for i in indices:
+                    results[i] = {**language.unsupported_result(), "language": lang, "source": "unsupported"}
+                continue
+            # Worker processes only hold the English models
+            scored = _score_group(
+                bundle, articles, indices, domain_index, calibration=language.bundle_calibration(lang)
+            )
+        for i, result in zip(indices, scored):
+            result["language"] = lang
+            result["source"] = "model"
+            results[i] = result
+    return results
+
+
+def score_in_stages(models, article, domain_index=None, pool=None):
+    """
+    Score one article like score_articles(), satire first.
+
+    For an English article that goes through the models, yields
+    ("satire", scoring.satire_stage() entry) as soon as the satire model
+    has run, then ("result", result) once the fake model has too (in the
+    pool when one is given). Everything else yields only ("result", ...).
+    """
+    lang, result = _route(article, domain_index)
+    if result or lang != language.ENGLISH:
+        yield "result", result or score_articles(models, [article], domain_index, pool)[0]
+        return
+
+    domains = [article["domain"]]
+    learned = domain_index.adjustments(domains) if domain_index is not None else {}
+    adjustments = scoring.combine_adjustments(scoring.DOMAIN_ADJUSTMENTS, learned)
+    satire_raw, satire = scoring.satire_stage(
+        models, [article["title"]], [article["text"]], domains, adjustments
+    )
+    yield "satire", satire[0]
+
+    result = _score_group(models, [article], [0], pool=pool, learned=learned, satire_raw=satire_raw)[0]
+    result["language"] = lang
+    result["source"] = "model"
+    yield "result", result
+
+
+def _route(article, domain_index):
+    """
+    Language of an article, plus its result when the models are not needed
+    (a verdict_cache hit or a domain known well enough to short-circuit).
+    """
+    lang = language.detect(article["title"], article["text"])
+    result = None
+    if article["cached"]:
+        _, _, satire_prob, fake_prob, _ = article["cached"]
+        result = scoring.build_results(scoring.joint([satire_prob], [fake_prob]))[0]
+        result["source"] = "cache"
+    elif domain_index is not None:
+        result = domain_index.short_circuit(article["domain"])
+        if result:
+            result["source"] = "reputation"
+    if result:
+        result["language"] = lang
+    return lang, result
+
+
+def _score_group(models, articles, indices, domain_index=None, pool=None, calibration=None,
+                 learned=None, satire_raw=None):
+    titles = [articles[i]["title"] for i in indices]
+    texts = [articles[i]["text"] for i in indices]
+    domains = [articles[i]["domain"] for i in indices]
+    if learned is None:
+        # Read once: a snapshot between two reads would take different
+        # shifts out of index_verdict than the ones applied
+        learned = domain_index.adjustments(domains) if domain_index is not None else {}
+    adjustments = scoring.combine_adjustments(scoring.DOMAIN_ADJUSTMENTS, learned)
+    if pool is not None:
+        results = pool.score(titles, texts, domains, adjustments, satire_raw)
+    else:
+        results = scoring.score_batch(models, titles, texts, domains, adjustments, calibration, satire_raw)
+    for result, verdict in zip(results, scoring.unshifted_verdicts(results, domains, learned)):
+        result["index_verdict"] = verdict
+    return results
+
+
+def save_result(user_id, article, result, domain_index=None):
+    """
+    Write an analysis to history and count it in the domain index.
+
+    Unsupported-language results carry no probabilities and are not saved.
+    Only model verdicts are counted: cached and reputation verdicts would
+    feed the index its own output.
+
+    Returns:
+        int: the history row id, or None when nothing was saved
+    """
+    if result["verdict"] == "unsupported":
+        return None
+    index_verdict = result.get("index_verdict") if result.get("source") == "model" else None
+    history_id = db.add_history(
+        user_id, article["url"], article["title"], result["verdict"],
+        result["satire_prob"], result["fake_prob"], article["text"], index_verdict,
+    )
+    if domain_index is not None and index_verdict is not None:
+        domain_index.record(article["domain"], index_verdict, history_id)
+    return history_id
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+JSON API exposing the analyze flow to programmatic clients.
+
+Run with:
+    uvicorn api:app --host 0.0.0.0 --port 8000
+
+Every endpoint except POST /keys needs an X-API-Key header and acts as
+the user the key belongs to. Keys are issued for a username and password
+registered through the app.
+
+Endpoints:
+    POST   /keys           {"username": ..., "password": ...} -> {"api_key": ...}
+    DELETE /keys           revoke the key sent in X-API-Key
+    POST   /analyze        {"url": ...} or {"title": ..., "text": ...}, plus "save": true
+                           to add the result to the caller's history
+    POST   /analyze/batch  {"items": [<analyze request>, ...]}
+    GET    /history        the caller's history
+    GET    /search         ?q=<words>[&limit=<n>], over the caller's history
+"""
+
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+import requests
+from fastapi import FastAPI, HTTPException, Security
+from fastapi.security import APIKeyHeader
+from pydantic import BaseModel, Field
+
+import analysis
+import db
+import scoring
+from domain_index import DomainIndex
+from scrapers.dispatch import DomainUnavailable
+from workers import WorkerPool
+
+ANALYZE_TIMEOUT = float(os.environ.get("ANALYZE_TIMEOUT", 20))
+USE_PROCESSES = os.environ.get("USE_PROCESSES", "1") != "0"
+SCORE_WORKERS = int(os.environ.get("SCORE_WORKERS", os.cpu_count() or 4))
+SCRAPE_WORKERS = int(os.environ.get("SCRAPE_WORKERS", 32))
+MAX_BATCH = 50
+
+log = logging.getLogger("api")
+state = {}
+
+
+@asynccontextmanager
+async def lifespan(app):
+    db.init_db()
+    state["models"] = scoring.load_models()
+    state["domain_index"] = DomainIndex().load()
+    state["worker_pool"] = WorkerPool(models=state["models"]) if USE_PROCESSES else None
+    # Scraping is network-bound, scoring CPU-bound: keep them on separate
+    # pools so slow sites cannot starve the scorer.
+    state["scrape_pool"] = ThreadPoolExecutor(SCRAPE_WORKERS, thread_name_prefix="scrape")
+    state["score_pool"] = ThreadPoolExecutor(SCORE_WORKERS, thread_name_prefix="score")
+    yield
+    state["domain_index"].snapshot()
+    if state["worker_pool"] is not None:
+        state["worker_pool"].shutdown()
+    state["scrape_pool"].shutdown(wait=False, cancel_futures=True)
+    state["score_pool"].shutdown(wait=False, cancel_futures=True)
+
+
+app = FastAPI(title="Fake News Detector API", lifespan=lifespan)
+
+
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
+
+
+class KeyRequest(BaseModel):
+    username: str
+    password: str
+
+
+class AnalyzeRequest(BaseModel):
+    url: Optional[str] = None
+    title: Optional[str] = None
+    text: Optional[str] = None
+    save: bool = Field(False, description="save the result to the caller's history")
+
+
+class BatchRequest(BaseModel):
+    items: List[AnalyzeRequest] = Field(..., max_length=MAX_BATCH)
+
+
+async def _run(pool, fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(state[pool], fn, *args)
+
+
+async def current_user(api_key: Optional[str] = Security(api_key_header)):
+    """The user_id the request's X-API-Key belongs to."""
+    user_id = await _run("score_pool", db.get_api_key_user, api_key) if api_key else None
+    if user_id is None:
+        raise HTTPException(401, "Missing or invalid API key", headers={"WWW-Authenticate": "X-API-Key"})
+    return user_id
+
+
+async def _fetch(item):
+    try:
+        article = await _run(
+            "scrape_pool", analysis.fetch_article, item.url, item.title, item.text, state["worker_pool"]
+        )
+    except ValueError as e:
+        raise HTTPException(422, str(e))
+    except DomainUnavailable as e:
+        raise HTTPException(503, str(e))
+    except requests.RequestException as e:
+        raise HTTPException(502, f"Scraping failed: {e}")
+    except Exception:
+        # A parser bug on one page must not fail the rest of a batch
+        log.exception("fetching %s failed", item.url)
+        raise HTTPException(500, "Could not extract an article from this page")
+    if not article["title"] and not article["text"]:
+        raise HTTPException(422, "Please provide url, title or text.")
+    return article
+
+
+def _response(article, result, history_id=None):
+    return {
+        "url": article["url"],
+        "domain": article["domain"],
+        "title": article["title"],
+        "extraction_quality": article["quality"],
+        "history_id": history_id,
+        **result,
+    }
+
+
+async def _analyze(items, user_id):
+    """
+    Fetch all items concurrently, then score the successful ones in one batch.
+
+    Items that fail to resolve come back as {"error": ..., "status": ...};
+    _fetch() maps every failure, expected or not, to an HTTPException.
+    """
+    fetched = await asyncio.gather(*(_fetch(item) for item in items), return_exceptions=True)
+    ok = [i for i, outcome in enumerate(fetched) if not isinstance(outcome, HTTPException)]
+    articles = [fetched[i] for i in ok]
+    results = await _run(
+        "score_pool", analysis.score_articles,
+        state["models"], articles, state["domain_index"], state["worker_pool"],
+    )
+
+    responses = [
+        {"error": outcome.detail, "status": outcome.status_code}
+        if isinstance(outcome, HTTPException) else None
+        for outcome in fetched
+    ]
+    for i, article, result in zip(ok, articles, results):
+        history_id = None
+        if items[i].save:
+            history_id = await _run(
+                "score_pool", analysis.save_result, user_id, article, result, state["domain_index"]
+            )
+        responses[i] = _response(article, result, history_id)
+    return responses
+
+
+async def _with_timeout(coro):
+    try:
+        return await asyncio.wait_for(coro, ANALYZE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(504, f"Analysis timed out after {ANALYZE_TIMEOUT:g}s")
+
+
+@app.post("/keys")
+async def create_key(credentials: KeyRequest):
+    user_id = await _run("score_pool", db.validate_user, credentials.username, credentials.password)
+    if user_id is None:
+        raise HTTPException(401, "Invalid username or password")
+    return {"api_key": await _run("score_pool", db.create_api_key, user_id)}
+
+
+@app.delete("/keys")
+async def revoke_key(api_key: Optional[str] = Security(api_key_header)):
+    await current_user(api_key)
+    await _run("score_pool", db.delete_api_key, api_key)
+    return {"revoked": True}
+
+
+@app.post("/analyze")
+async def analyze(item: AnalyzeRequest, user_id: int = Security(current_user)):
+    response = (await _with_timeout(_analyze([item], user_id)))[0]
+    if "error" in response:
+        raise HTTPException(response["status"], response["error"])
+    return response
+
+
+@app.post("/analyze/batch")
+async def analyze_batch(batch: BatchRequest, user_id: int = Security(current_user)):
+    return {"results": await _with_timeout(_analyze(batch.items, user_id))}
+
+
+@app.get("/history")
+async def history(user_id: int = Security(current_user)):
+    rows = await _run("score_pool", db.get_user_history, user_id)
+    keys = ("url", "title", "verdict", "satire_prob", "fake_prob", "timestamp")
+    return {"history": [dict(zip(keys, row)) for row in rows]}
+
+
+@app.get("/search")
+async def search(q: str, limit: int = 20, user_id: int = Security(current_user)):
+    rows = await _run("score_pool", db.search_history, q, user_id, min(max(limit, 1), 100))
+    keys = ("id", "url", "title", "verdict", "satire_prob", "fake_prob", "timestamp", "score")
+    return {"results": [dict(zip(keys, row)) for row in rows]}
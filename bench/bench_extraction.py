@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Measure what boilerplate removal does to extracted text size and scoring time.
+
+For each saved article page, compares joining every <p> on the page (the
+punch.py fallback) with the same paragraphs after clean_paragraphs(), and
+times scoring.score_batch() on both.
+
+Without pages, the Punch-style page shipped with the tests is used.
+
+Usage:
+    python bench/bench_extraction.py
+    python bench/bench_extraction.py fixtures/punchng.com/*.html --repeat 20
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+DEFAULT_PAGES = [os.path.join(ROOT, "tests", "fixtures", "pages", "punch_article.html")]
+
+import scoring  # noqa: E402
+from scrapers.boilerplate import clean_paragraphs  # noqa: E402
+
+
+def _time_scoring(models, titles, texts, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        scoring.score_batch(models, titles, texts)
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Boilerplate removal benchmark")
+    parser.add_argument("pages", nargs="*", default=DEFAULT_PAGES, help="saved article HTML files")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    models = scoring.load_models()
+    titles, raw_texts, clean_texts = [], [], []
+    print(f"{'page':40} {'raw chars':>10} {'clean chars':>12} {'reduction':>10} {'quality':>8}")
+    for path in args.pages:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            soup = BeautifulSoup(f.read(), "html.parser")
+        h1 = soup.find("h1")
+        paragraphs = soup.find_all("p")
+        raw = "\n\n".join(p.get_text(strip=True) for p in paragraphs)
+        clean, quality = clean_paragraphs(paragraphs)
+        titles.append(h1.get_text(strip=True) if h1 else "")
+        raw_texts.append(raw)
+        clean_texts.append(clean)
+        reduction = 1 - len(clean) / max(len(raw), 1)
+        print(f"{os.path.basename(path)[:40]:40} {len(raw):>10} {len(clean):>12} {reduction:>10.1%} {quality:>8.2f}")
+
+    raw_s = _time_scoring(models, titles, raw_texts, args.repeat)
+    clean_s = _time_scoring(models, titles, clean_texts, args.repeat)
+    total_raw = sum(map(len, raw_texts))
+    total_clean = sum(map(len, clean_texts))
+    print()
+    print(f"total chars: {total_raw} -> {total_clean} ({1 - total_clean / max(total_raw, 1):.1%} smaller)")
+    print(f"scoring {len(titles)} pages: {raw_s * 1000:.1f} ms -> {clean_s * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Cost of a Streamlit rerun on the main and history pages.
+
+Drives the pages headlessly with streamlit.testing, logged in as a fresh
+user with --rows history rows, in a scratch directory (the model pickles
+are linked in). After one analysis, every further rerun is a plain widget
+interaction; the report shows wall time and how many SQLite connections
+and analysis.score_articles() / score_in_stages() calls each rerun made.
+
+Usage:
+    python bench/bench_rerun.py --reruns 20 --rows 200
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+import analysis  # noqa: E402
+import db  # noqa: E402
+import scoring  # noqa: E402
+
+ARTICLE_TITLE = "Government announces new budget"
+ARTICLE_TEXT = (
+    "The federal government on Monday announced a new budget, which includes "
+    "spending on roads, schools and hospitals, and officials said the plan would "
+    "be presented to lawmakers for debate next week. "
+) * 10
+
+counts = {"connections": 0, "scoring": 0}
+
+
+def _count(name, fn):
+    def wrapper(*args, **kwargs):
+        counts[name] += 1
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def setup(rows):
+    for name in scoring.MODEL_FILES + (scoring.CALIBRATION_FILE,):
+        if os.path.exists(os.path.join(ROOT, name)):
+            os.symlink(os.path.join(ROOT, name), name)
+    db.init_db()
+    db.add_user("bench", "bench")
+    user_id = db.validate_user("bench", "bench")
+    for i in range(rows):
+        db.add_history(user_id, f"https://example.com/{i}", f"Story {i}", "real", 0.1, 0.2, ARTICLE_TEXT)
+    return user_id
+
+
+def measure(app, reruns, interact):
+    """Rerun app reruns times; returns per-rerun (ms, connections, scoring calls)."""
+    samples = []
+    for _ in range(reruns):
+        counts.update(connections=0, scoring=0)
+        started = time.perf_counter()
+        interact(app)
+        samples.append(((time.perf_counter() - started) * 1000, counts["connections"], counts["scoring"]))
+    return samples
+
+
+def report(label, samples):
+    ms = [s[0] for s in samples]
+    print(
+        f"{label:<28} median {statistics.median(ms):7.1f} ms   max {max(ms):7.1f} ms   "
+        f"db connections/rerun {statistics.mean(s[1] for s in samples):5.1f}   "
+        f"scoring calls/rerun {statistics.mean(s[2] for s in samples):4.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=200, help="history rows for the bench user")
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="bench_rerun_"))
+    user_id = setup(args.rows)
+    # Count every connection, whether opened through db.connect() or directly
+    sqlite3.connect = _count("connections", sqlite3.connect)
+    analysis.score_articles = _count("scoring", analysis.score_articles)
+    analysis.score_in_stages = _count("scoring", analysis.score_in_stages)
+
+    main_page = AppTest.from_file(os.path.join(ROOT, "main.py"), default_timeout=120)
+    main_page.session_state["user_id"] = user_id
+    main_page.session_state["username"] = "bench"
+    main_page.run()
+    main_page.text_input[1].set_value(ARTICLE_TITLE)
+    main_page.text_area[0].set_value(ARTICLE_TEXT)
+    main_page.button[0].click().run()
+    time.sleep(0.5)  # let the background history write land
+
+    # A widget interaction that does not change the inputs
+    report("main.py rerun", measure(main_page, args.reruns, lambda app: app.run()))
+    shown = any("Verdict in" in caption.value for caption in main_page.caption)
+    print(f"{'':<28} verdict still shown after reruns: {'yes' if shown else 'no'}")
+
+    history_page = AppTest.from_file(os.path.join(ROOT, "pages", "history.py"), default_timeout=120)
+    history_page.session_state["user_id"] = user_id
+    history_page.session_state["username"] = "bench"
+    history_page.run()
+    report("pages/history.py rerun", measure(history_page, args.reruns, lambda app: app.run()))
+
+
+if __name__ == "__main__":
+    main()
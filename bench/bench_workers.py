@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Parse-and-score throughput in-process vs. WorkerPool at increasing process counts.
+
+Uses saved article pages when given (with the scraper domain they belong
+to), otherwise a synthetic BBC-style page.
+
+Usage:
+    python bench/bench_workers.py --jobs 400
+    python bench/bench_workers.py --domain punchng.com fixtures/punchng.com/*.html
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import scoring  # noqa: E402
+from scrapers import parse_html  # noqa: E402
+from workers import WorkerPool  # noqa: E402
+
+PARAGRAPH = (
+    "<p>The federal government on Monday announced a new budget, which includes "
+    "spending on roads, schools and hospitals, and officials said the plan would "
+    "be presented to lawmakers for debate next week.</p>"
+)
+
+
+def synthetic_page(paragraphs=60):
+    return f"<html><body><h1>Budget announced</h1><article>{PARAGRAPH * paragraphs}</article></body></html>"
+
+
+def run_in_process(models, pages, domain, jobs):
+    started = time.perf_counter()
+    for i in range(jobs):
+        data = parse_html(domain, pages[i % len(pages)], "")
+        scoring.score_batch(models, [data["title"]], [data["text"]], [domain])
+    return time.perf_counter() - started
+
+
+def run_pool(pool, pages, domain, jobs, clients):
+    def job(i):
+        return pool.parse_and_score(domain, pages[i % len(pages)], "")
+
+    for i in range(pool.processes):  # warm every worker's model load
+        job(i)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(clients) as threads:
+        list(threads.map(job, range(jobs)))
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WorkerPool scaling benchmark")
+    parser.add_argument("pages", nargs="*", help="saved article HTML files")
+    parser.add_argument("--domain", default="bbc.com", help="scraper domain of the pages")
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--max-processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    pages = []
+    for path in args.pages:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            pages.append(f.read())
+    pages = pages or [synthetic_page()]
+
+    models = scoring.load_models()
+    baseline = run_in_process(models, pages, args.domain, args.jobs)
+    print(f"{'mode':>14} {'jobs/s':>10} {'speedup':>8}")
+    print(f"{'in-process':>14} {args.jobs / baseline:>10.1f} {1.0:>8.2f}")
+
+    processes = 1
+    while processes <= args.max_processes:
+        pool = WorkerPool(processes)
+        try:
+            elapsed = run_pool(pool, pages, args.domain, args.jobs, clients=processes * 2)
+            label = f"{processes} proc" + (" (fallback)" if pool.in_process else "")
+        finally:
+            pool.shutdown()
+        print(f"{label:>14} {args.jobs / elapsed:>10.1f} {baseline / elapsed:>8.2f}")
+        processes *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Load test for api.py: requests/sec and latency percentiles on one node.
+
+Sends manual title/text requests by default so the numbers measure the API
+and scoring, not the news sites. Pass --url to include scraping.
+
+Usage:
+    uvicorn api:app --port 8000 --workers 1 &
+    python bench/load_api.py --username bench --password bench --concurrency 32 --requests 2000
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+SAMPLE = {
+    "title": "Government announces new budget for infrastructure",
+    "text": (
+        "The federal government on Monday announced a new budget that "
+        "includes spending on roads, schools and hospitals across the country. "
+        "Officials said the plan would be presented to lawmakers next week."
+    ),
+}
+
+_local = threading.local()
+
+
+def _session(api_key):
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+        _local.session.headers["X-API-Key"] = api_key
+    return _local.session
+
+
+def _one(endpoint, payload, api_key):
+    started = time.perf_counter()
+    try:
+        ok = _session(api_key).post(endpoint, json=payload, timeout=60).ok
+    except requests.RequestException:
+        ok = False
+    return time.perf_counter() - started, ok
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the analyze API")
+    parser.add_argument("--base", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--batch", type=int, default=0, help="use /analyze/batch with this many items")
+    parser.add_argument("--url", help="analyze this article URL instead of manual text")
+    parser.add_argument("--username", required=True, help="app account to request an API key for")
+    parser.add_argument("--password", required=True)
+    args = parser.parse_args()
+
+    response = requests.post(
+        f"{args.base}/keys", json={"username": args.username, "password": args.password}, timeout=60
+    )
+    response.raise_for_status()
+    api_key = response.json()["api_key"]
+
+    item = {"url": args.url} if args.url else SAMPLE
+    if args.batch:
+        endpoint, payload = f"{args.base}/analyze/batch", {"items": [item] * args.batch}
+    else:
+        endpoint, payload = f"{args.base}/analyze", item
+
+    _one(endpoint, payload, api_key)  # warm up
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        outcomes = list(pool.map(lambda _: _one(endpoint, payload, api_key), range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for latency, _ in outcomes]
+    errors = sum(1 for _, ok in outcomes if not ok)
+    articles = args.requests * (args.batch or 1)
+    print(f"requests:     {args.requests} ({errors} errors) at concurrency {args.concurrency}")
+    print(f"throughput:   {args.requests / elapsed:.1f} req/s, {articles / elapsed:.1f} articles/s")
+    print(f"latency mean: {statistics.mean(latencies) * 1000:.1f} ms")
+    for q in (0.5, 0.95, 0.99):
+        print(f"latency p{int(q * 100)}:  {percentile(latencies, q) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
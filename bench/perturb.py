@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+Verdict stability under simple adversarial perturbations.
+
+Each article in the corpus is perturbed with homoglyphs, zero-width
+characters, soft hyphens, fullwidth letters, strike-through marks and
+spaced-out words, then scored with and without normalize.normalize_text()
+in front of the vectorizers. For each perturbation the report shows how
+often the verdict matches the clean article's and how far the calibrated
+probabilities move. It also times normalize_text() against a vectorizer
+transform.
+
+The corpus is a handful of built-in articles, or the title/text columns
+of a history export (see history_io.py).
+
+Usage:
+    python bench/perturb.py
+    python bench/perturb.py --corpus history.csv.gz --limit 500
+"""
+
+import argparse
+import csv
+import gzip
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np  # noqa: E402
+
+import normalize  # noqa: E402
+import scoring  # noqa: E402
+
+CORPUS = (
+    (
+        "Senate approves 2026 budget after marathon debate",
+        "The Senate on Tuesday approved the 2026 appropriation bill after a debate that lasted "
+        "late into the night. Lawmakers said the budget increases spending on roads, schools and "
+        "primary health care, and the bill will now be sent to the president for assent.",
+    ),
+    (
+        "Doctors confirm drinking hot water cures malaria in one day",
+        "A viral message shared thousands of times claims that doctors have confirmed that drinking "
+        "hot water with lime cures malaria within a day. The message urges readers to share it "
+        "before it is deleted and says hospitals are hiding the secret cure.",
+    ),
+    (
+        "Local man declares himself president of his kitchen",
+        "In a stunning constitutional crisis, area man Tunde, 34, announced Sunday that he had "
+        "seized control of his kitchen and would govern it by decree, promising free jollof for "
+        "all citizens who recognize the new administration.",
+    ),
+    (
+        "Central bank holds interest rate at 27.5 percent",
+        "The central bank's monetary policy committee voted to hold the benchmark interest rate, "
+        "citing easing inflation and a more stable exchange rate. The governor said the committee "
+        "would continue to monitor price developments closely.",
+    ),
+    (
+        "Government to give every citizen free cars, says leaked memo",
+        "A leaked memo circulating on social media claims the federal government will give every "
+        "citizen a free car before the elections. Officials have not confirmed the memo, which "
+        "asks recipients to send their bank details to a private number.",
+    ),
+    (
+        "Flooding displaces thousands in riverside communities",
+        "Heavy rainfall over the weekend caused flooding in several riverside communities, "
+        "displacing thousands of residents. Emergency officials said relief camps had been opened "
+        "and urged people living along the riverbanks to move to higher ground.",
+    ),
+)
+
+# Latin letter -> look-alikes, inverted from normalize.CONFUSABLES
+HOMOGLYPHS = {}
+for fake, latin in normalize.CONFUSABLES.items():
+    HOMOGLYPHS.setdefault(latin, []).append(fake)
+
+
+def _words(rng, text, share, fn, isolated=False):
+    out = []
+    previous = False
+    for word in text.split(" "):
+        # isolated: never two perturbed words in a row ("f a k e n e w s" is
+        # ambiguous even to a reader, so nothing can be expected to undo it)
+        perturb = len(word) > 3 and rng.random() < share and not (isolated and previous)
+        out.append(fn(word) if perturb else word)
+        previous = perturb
+    return " ".join(out)
+
+
+def homoglyphs(rng, text):
+    return "".join(
+        rng.choice(HOMOGLYPHS[ch]) if ch in HOMOGLYPHS and rng.random() < 0.4 else ch for ch in text
+    )
+
+
+def zero_width(rng, text):
+    return _words(rng, text, 0.5, lambda w: w[:len(w) // 2] + "\u200b" + w[len(w) // 2:])
+
+
+def soft_hyphens(rng, text):
+    return _words(rng, text, 0.5, lambda w: "\u00ad".join(w))
+
+
+def fullwidth(rng, text):
+    return _words(rng, text, 0.5, lambda w: "".join(chr(ord(c) + 0xFEE0) if "!" <= c <= "~" else c for c in w))
+
+
+def strike_through(rng, text):
+    return _words(rng, text, 0.3, lambda w: "".join(c + "\u0336" for c in w))
+
+
+def spaced(rng, text):
+    return _words(rng, text, 0.3, lambda w: " ".join(w) if w.isalpha() else w, isolated=True)
+
+
+def dotted(rng, text):
+    return _words(rng, text, 0.3, lambda w: ".".join(w) if w.isalpha() else w, isolated=True)
+
+
+def mixed(rng, text):
+    for perturb in (homoglyphs, zero_width, spaced):
+        text = perturb(rng, text)
+    return text
+
+
+PERTURBATIONS = (homoglyphs, zero_width, soft_hyphens, fullwidth, strike_through, spaced, dotted, mixed)
+
+
+def load_corpus(path, limit):
+    if not path:
+        return list(CORPUS)
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", newline="") as f:
+        rows = [(row["title"], row.get("text") or "") for row in csv.DictReader(f) if row.get("title")]
+    return rows[:limit]
+
+
+def score(models, titles, texts, normalized):
+    original = scoring.normalize_text
+    if not normalized:
+        scoring.normalize_text = lambda text: text
+    try:
+        return scoring.score_batch(models, titles, texts)
+    finally:
+        scoring.normalize_text = original
+
+
+def stability(clean, perturbed):
+    same = np.mean([a["verdict"] == b["verdict"] for a, b in zip(clean, perturbed)])
+    fake = np.mean([abs(a["fake_prob"] - b["fake_prob"]) for a, b in zip(clean, perturbed)])
+    satire = np.mean([abs(a["satire_prob"] - b["satire_prob"]) for a, b in zip(clean, perturbed)])
+    return same, fake, satire
+
+
+def time_per_doc(fn, docs, repeat=20):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for doc in docs:
+            fn(doc)
+    return (time.perf_counter() - started) / (repeat * len(docs)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", help="history export (.csv / .csv.gz) to use instead of the built-in articles")
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus, args.limit)
+    titles = [title for title, _ in corpus]
+    texts = [text for _, text in corpus]
+    models = scoring.load_models()
+    clean_raw = score(models, titles, texts, normalized=False)
+    clean = score(models, titles, texts, normalized=True)
+    changed = sum(a["verdict"] != b["verdict"] for a, b in zip(clean_raw, clean))
+    print(f"{len(corpus)} articles; clean verdicts changed by normalization: {changed}\n")
+
+    print(f"{'perturbation':<16}{'verdict kept':>26}{'mean |d fake|':>24}{'mean |d satire|':>24}")
+    print(f"{'':<16}{'raw':>13}{'normalized':>13}{'raw':>12}{'normalized':>12}{'raw':>12}{'normalized':>12}")
+    perturbed_docs = []
+    for perturb in PERTURBATIONS:
+        rng = random.Random(args.seed)
+        p_titles = [perturb(rng, title) for title in titles]
+        p_texts = [perturb(rng, text) for text in texts]
+        perturbed_docs.extend(f"{t}. {x}" for t, x in zip(p_titles, p_texts))
+        raw = stability(clean_raw, score(models, p_titles, p_texts, normalized=False))
+        fixed = stability(clean, score(models, p_titles, p_texts, normalized=True))
+        print(
+            f"{perturb.__name__:<16}{raw[0]:>13.0%}{fixed[0]:>13.0%}"
+            f"{raw[1]:>12.3f}{fixed[1]:>12.3f}{raw[2]:>12.3f}{fixed[2]:>12.3f}"
+        )
+
+    clean_docs = [f"{t}. {x}" for t, x in corpus]
+    vectorizer = models[1]
+    print(
+        f"\nnormalize_text: {time_per_doc(normalize.normalize_text, clean_docs):.1f} us/doc clean, "
+        f"{statistics.mean([time_per_doc(normalize.normalize_text, [d], 5) for d in perturbed_docs]):.1f} us/doc perturbed; "
+        f"vectorizer transform {time_per_doc(lambda d: vectorizer.transform([d]), clean_docs, 5):.0f} us/doc"
+    )
+
+
+if __name__ == "__main__":
+    main()
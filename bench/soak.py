@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""
+Load and soak run of the full analyze flow against local stand-in sites.
+
+Starts bench/stub_server.py as an HTTP proxy in front of a fixture tree
+for the ten supported sites, so article URLs keep their real hosts and go
+through the dedicated scrapers, the scrape dispatcher, scoring and the
+history write exactly as in main.py. Each simulated user loops over:
+pick an article, analysis.fetch_article(), analysis.score_articles(),
+analysis.save_result(), think.
+
+Without --fixtures, a synthetic page per site is generated that every
+site parser accepts. With --fixtures, saved pages laid out as
+<dir>/<domain>/<path>.html are replayed instead.
+
+Every --report-every seconds, and once at the end, it prints:
+- throughput and end-to-end latency percentiles over the window
+- failures by kind
+- history write latency and "database is locked" errors (SQLite lock
+  waits show up as write latency: connections wait up to 5s for the lock)
+- resident memory of this process and its growth since the first window
+
+Usage:
+    python bench/soak.py --users 50 --duration 300
+    python bench/soak.py --users 200 --duration 3600 --latency 0.3 --jitter 0.5 --error-rate 0.02
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+
+import analysis  # noqa: E402
+import db  # noqa: E402
+import scoring  # noqa: E402
+from domain_index import DomainIndex  # noqa: E402
+from scrapers import PARSER_MAP, fetch  # noqa: E402
+from scrapers.dispatch import ScrapeDispatcher  # noqa: E402
+from stub_server import start_server  # noqa: E402
+from workers import WorkerPool  # noqa: E402
+
+SITES = sorted({domain[4:] if domain.startswith("www.") else domain for domain in PARSER_MAP})
+
+SENTENCES = (
+    "The federal government on Monday announced a new budget for roads, schools and hospitals.",
+    "Officials said the plan would be presented to lawmakers for debate next week.",
+    "Residents told reporters that prices at the market had doubled since January.",
+    "The police spokesperson confirmed that two suspects had been arrested.",
+    "Experts warned that the claims circulating online were not supported by evidence.",
+    "Local man declares himself president of his own kitchen after winning argument with toaster.",
+    "The governor promised to complete the bridge before the rainy season.",
+    "A viral message claims the vaccine contains a tracking chip, which health officials denied.",
+)
+
+# Nested so that each site's parser finds its container: <section> for
+# pulse.ng, <article> for BBC, "content story" for Sahara Reporters, and the
+# class names the other parsers look for on the innermost div.
+PAGE = """<html><head><title>{title}</title></head><body>
+<h1>{title}</h1>
+<section class="space-y-5 sm:space-y-7"><article><div class="content story">
+<div class="article-content entry-content article-body wysiwyg story__body">
+{paragraphs}
+</div></div></article></section>
+</body></html>"""
+
+
+def synthetic_fixtures(root, articles, seed=0):
+    """Write articles pages per site under root; returns their URLs."""
+    rng = random.Random(seed)
+    urls = []
+    for domain in SITES:
+        os.makedirs(os.path.join(root, domain, "news"), exist_ok=True)
+        for i in range(articles):
+            title = rng.choice(SENTENCES).rstrip(".")
+            paragraphs = "\n".join(
+                f"<p>{' '.join(rng.choices(SENTENCES, k=3))}</p>" for _ in range(rng.randint(8, 40))
+            )
+            with open(os.path.join(root, domain, "news", f"article-{i}.html"), "w", encoding="utf-8") as f:
+                f.write(PAGE.format(title=title, paragraphs=paragraphs))
+            urls.append(f"http://{domain}/news/article-{i}.html")
+    return urls
+
+
+def fixture_urls(root):
+    """URLs for saved pages laid out as <root>/<domain>/<path>.html."""
+    urls = []
+    for domain in sorted(os.listdir(root)):
+        for directory, _, files in os.walk(os.path.join(root, domain)):
+            for name in files:
+                if name.endswith((".html", ".htm")):
+                    path = os.path.relpath(os.path.join(directory, name), os.path.join(root, domain))
+                    urls.append(f"http://{domain}/{path.replace(os.sep, '/')}")
+    return urls
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+class Stats:
+    """Samples for the current reporting window, swapped out by window()."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.latencies = []
+        self.writes = []
+        self.failures = Counter()
+
+    def ok(self, latency):
+        with self._lock:
+            self.latencies.append(latency)
+
+    def failed(self, kind):
+        with self._lock:
+            self.failures[kind] += 1
+
+    def write(self, latency):
+        with self._lock:
+            self.writes.append(latency)
+
+    def window(self):
+        with self._lock:
+            snapshot = (self.latencies, self.writes, self.failures)
+            self._reset()
+        return snapshot
+
+
+def timed_writes(stats, fn):
+    # Failures propagate to user_loop(), which counts them
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            stats.write(time.perf_counter() - started)
+    return wrapper
+
+
+def failure_kind(error):
+    """The label an analysis failure is counted under in the report."""
+    if isinstance(error, sqlite3.OperationalError):
+        return "database is locked" if "locked" in str(error) else "sqlite error"
+    return type(error).__name__
+
+
+def user_loop(user_id, urls, models, domain_index, pool, stats, think, stop):
+    rng = random.Random(user_id)
+    while not stop.is_set():
+        url = rng.choice(urls)
+        started = time.perf_counter()
+        try:
+            article = analysis.fetch_article(url, pool=pool)
+            result = analysis.score_articles(models, [article], domain_index, pool)[0]
+            analysis.save_result(user_id, article, result, domain_index)
+            stats.ok(time.perf_counter() - started)
+        except Exception as e:
+            stats.failed(failure_kind(e))
+        stop.wait(rng.expovariate(1 / think) if think else 0)
+
+
+def report(label, elapsed, window, stats_window, rss, rss_start):
+    latencies, writes, failures = stats_window
+    done = len(latencies)
+    line = (
+        f"{label:>7} {elapsed:7.0f}s  {done / window:7.1f} req/s  "
+        f"p50 {percentile(latencies, 0.50) * 1000:6.0f}  p95 {percentile(latencies, 0.95) * 1000:6.0f}  "
+        f"p99 {percentile(latencies, 0.99) * 1000:6.0f} ms  "
+        f"write p99 {percentile(writes, 0.99) * 1000:5.0f} max {max(writes, default=0) * 1000:5.0f} ms  "
+        f"rss {rss:6.0f} MB ({rss - rss_start:+.0f})"
+    )
+    if failures:
+        line += "  failed: " + ", ".join(f"{kind} {count}" for kind, count in failures.most_common())
+    print(line, flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=50, help="simulated concurrent users")
+    parser.add_argument("--duration", type=float, default=300, help="seconds to run")
+    parser.add_argument("--think", type=float, default=1.0, help="mean pause between a user's analyses, seconds")
+    parser.add_argument("--latency", type=float, default=0.2, help="stub site latency, seconds")
+    parser.add_argument("--jitter", type=float, default=0.3, help="extra random stub latency, seconds")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="fraction of stub 503 responses")
+    parser.add_argument("--fixtures", help="saved pages as <dir>/<domain>/<path>.html (default: synthetic)")
+    parser.add_argument("--articles", type=int, default=50, help="synthetic articles per site")
+    parser.add_argument("--processes", type=int, default=0, help="worker processes (0: score in-process)")
+    parser.add_argument("--site-rate", type=float, default=None,
+                        help="per-site scrape rate limit, requests/s (default: the dispatcher's)")
+    parser.add_argument("--report-every", type=float, default=30)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="soak_")
+    os.chdir(workdir)
+    for name in scoring.MODEL_FILES + (scoring.CALIBRATION_FILE,):
+        if os.path.exists(os.path.join(ROOT, name)):
+            os.symlink(os.path.join(ROOT, name), name)
+    if args.fixtures:
+        urls = fixture_urls(os.path.abspath(args.fixtures))
+        fixtures = os.path.abspath(args.fixtures)
+    else:
+        fixtures = os.path.join(workdir, "fixtures")
+        urls = synthetic_fixtures(fixtures, args.articles)
+    if not urls:
+        parser.error("no fixture pages found")
+
+    server = start_server(fixtures, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+    os.environ["HTTP_PROXY"] = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ.pop("NO_PROXY", None)
+    os.environ.pop("no_proxy", None)
+    # The stand-in sites are only reached through the proxy; give their
+    # hosts a public address for the fetch guard instead of resolving them
+    fetch.resolve_host = lambda host: {"93.184.216.34"}
+
+    db.init_db()
+    for user in range(args.users):
+        db.add_user(f"soak{user}", "soak")
+    models = scoring.load_models()
+    domain_index = DomainIndex().load()
+    pool = WorkerPool(args.processes, models=models) if args.processes else None
+    if args.site_rate:
+        analysis.DISPATCHER = ScrapeDispatcher(rate=args.site_rate, burst=max(1, int(args.site_rate)))
+
+    stats = Stats()
+    db.add_history = timed_writes(stats, db.add_history)
+    stop = threading.Event()
+    threads = [
+        threading.Thread(
+            target=user_loop,
+            args=(user + 1, urls, models, domain_index, pool, stats, args.think, stop),
+            daemon=True,
+        )
+        for user in range(args.users)
+    ]
+
+    print(
+        f"{args.users} users, {len(urls)} pages on {len({u.split('/')[2] for u in urls})} sites, "
+        f"stub latency {args.latency}+{args.jitter}s, error rate {args.error_rate:.0%}, "
+        f"{'in-process scoring' if pool is None else f'{args.processes} worker processes'}, workdir {workdir}"
+    )
+    started = time.monotonic()
+    rss_start = rss_mb()
+    for thread in threads:
+        thread.start()
+
+    totals = ([], [], Counter())
+    last = started
+    while time.monotonic() - started < args.duration:
+        time.sleep(min(args.report_every, max(0.0, args.duration - (time.monotonic() - started))))
+        now = time.monotonic()
+        window = stats.window()
+        totals[0].extend(window[0])
+        totals[1].extend(window[1])
+        totals[2].update(window[2])
+        report("window", now - started, now - last, window, rss_mb(), rss_start)
+        last = now
+
+    stop.set()
+    for thread in threads:
+        thread.join(timeout=30)
+    domain_index.snapshot()
+    elapsed = time.monotonic() - started
+    report("total", elapsed, elapsed, totals, rss_mb(), rss_start)
+    conn = db.connect()
+    rows = conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+    conn.close()
+    print(f"{rows} history rows written; database {os.path.getsize(db.DB_FILE) / 2**20:.1f} MB")
+    if pool is not None:
+        pool.shutdown()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Local stand-in for the news sites, for offline crawler and load runs.
+
+Serves files from a fixture directory laid out as <root>/<domain>/<path>,
+e.g. fixtures/bbc.com/feed.xml and fixtures/bbc.com/news/article-1.html,
+with optional injected latency and error rate.
+
+Usage:
+    python bench/stub_server.py fixtures --port 8800 --latency 0.2 --error-rate 0.05
+
+Point crawler.py at it with a feeds file such as
+    {"bbc.com": ["http://127.0.0.1:8800/bbc.com/feed.xml"]}
+
+It also works as an HTTP forward proxy: with HTTP_PROXY=http://127.0.0.1:8800
+a request for http://www.bbc.com/news/article-1.html is served from
+fixtures/bbc.com/news/article-1.html, so the real site URLs (and their
+dedicated scrapers) can be used unchanged.
+"""
+
+import argparse
+import mimetypes
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    root = "."
+    latency = 0.0
+    jitter = 0.0
+    error_rate = 0.0
+
+    def do_GET(self):
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+        if self.error_rate and random.random() < self.error_rate:
+            self.send_error(503, "Injected failure")
+            return
+
+        target = self.path
+        if "://" in target:
+            # Proxied request: http://<host>/<path> -> <root>/<host>/<path>
+            parts = urlsplit(target)
+            host = (parts.hostname or "").lower()
+            if host.startswith("www."):
+                host = host[4:]
+            target = f"/{host}{parts.path}"
+        path = os.path.normpath(target.split("?", 1)[0].lstrip("/"))
+        full = os.path.join(self.root, path)
+        if path.startswith("..") or not os.path.isfile(full):
+            self.send_error(404)
+            return
+
+        with open(full, "rb") as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", mimetypes.guess_type(full)[0] or "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(root, port=0, latency=0.0, jitter=0.0, error_rate=0.0):
+    """
+    Start the stub server on a background thread.
+
+    Returns:
+        ThreadingHTTPServer: call .shutdown() to stop; the bound port is
+        server.server_address[1]
+    """
+    handler = type("Handler", (StubHandler,), {
+        "root": os.path.abspath(root),
+        "latency": latency,
+        "jitter": jitter,
+        "error_rate": error_rate,
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve fixture news sites locally")
+    parser.add_argument("root", help="fixture directory (<root>/<domain>/<path>)")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency, seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 503 responses")
+    args = parser.parse_args()
+
+    server = start_server(args.root, args.port, args.latency, args.jitter, args.error_rate)
+    print(f"Serving {args.root} on http://127.0.0.1:{server.server_address[1]}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+Background crawler that pre-scores new articles from the supported sites.
+
+Polls each site's RSS/Atom feed or sitemap, scrapes unseen article URLs
+with the matching scraper through a scrapers.dispatch.ScrapeDispatcher
+(per-domain rate limit, circuit breaker, adaptive timeouts), scores them in
+batches and stores the verdicts in verdict_cache, where main.py looks
+them up before scraping.
+
+Usage:
+    python crawler.py                      # poll forever
+    python crawler.py --once               # single pass
+    python crawler.py --feeds feeds.json   # override FEEDS, e.g. with a stub server
+"""
+
+import argparse
+import json
+import logging
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import db
+import language
+import scoring
+from domain_index import DomainIndex
+from scrapers import PARSER_MAP
+from scrapers.dispatch import ScrapeDispatcher
+from urls import canonical_url, resolve_canonical, strip_tracking
+
+log = logging.getLogger("crawler")
+
+# Feed URLs per scraper domain. Keys must be PARSER_MAP keys; the parser is
+# chosen by key, not by the article URL, so feeds can point at a local stub.
+FEEDS = {
+    "bbc.com": ["https://feeds.bbci.co.uk/news/rss.xml"],
+    "pulse.ng": ["https://www.pulse.ng/news/rss"],
+    "punchng.com": ["https://punchng.com/feed/"],
+    "instablog9ja.com": ["https://www.instablog9ja.com/feed"],
+    "theonion.com": ["https://theonion.com/feed/"],
+    "foxnews.com": ["https://moxie.foxnews.com/google-publisher/latest.xml"],
+    "arise.tv": ["https://www.arise.tv/feed/"],
+    "saharareporters.com": ["https://saharareporters.com/feeds/latest/feed"],
+    "channelstv.com": ["https://www.channelstv.com/feed/"],
+    "aljazeera.com": ["https://www.aljazeera.com/xml/rss/all.xml"],
+}
+
+CRAWL_RATE = 0.5        # requests per second to the same domain (one every 2s)
+MAX_PER_FEED = 20       # new articles scraped per feed per pass
+BATCH_SIZE = 32
+POLL_INTERVAL = 900.0
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_feed(xml_text):
+    """
+    Extract article URLs from an RSS, Atom or sitemap document.
+
+    Args:
+        xml_text (str | bytes): feed body
+
+    Returns:
+        List[str]: article URLs in document order, without duplicates
+    """
+    root = ET.fromstring(xml_text)
+    urls = []
+    for el in root.iter():
+        tag = _local(el.tag)
+        if tag == "item":
+            # RSS: <item><link>url</link></item>
+            for child in el:
+                if _local(child.tag) == "link" and (child.text or "").strip():
+                    urls.append(child.text.strip())
+                    break
+        elif tag == "entry":
+            # Atom: <entry><link href="url"/></entry>
+            for child in el:
+                if _local(child.tag) == "link" and child.get("rel", "alternate") == "alternate":
+                    urls.append(child.get("href", "").strip())
+                    break
+        elif tag == "url":
+            # Sitemap: <url><loc>url</loc></url>
+            for child in el:
+                if _local(child.tag) == "loc" and (child.text or "").strip():
+                    urls.append(child.text.strip())
+                    break
+    return [url for url in dict.fromkeys(urls) if url]
+
+
+class Crawler:
+    """
+    One crawler instance per process.
+
+    Args:
+        models: tuple returned by scoring.load_models()
+        feeds (dict): scraper domain -> list of feed URLs
+        dispatcher (ScrapeDispatcher): fetches feeds and articles, keyed by
+            scraper domain; defaults to one limited to CRAWL_RATE
+    """
+
+    def __init__(self, models, feeds=None, dispatcher=None, domain_index=None,
+                 max_per_feed=MAX_PER_FEED, batch_size=BATCH_SIZE):
+        self.models = models
+        self.feeds = FEEDS if feeds is None else feeds
+        # Requests for a domain are sequential, so no burst is needed
+        self.dispatcher = dispatcher or ScrapeDispatcher(rate=CRAWL_RATE, burst=1)
+        self.domain_index = domain_index
+        self.max_per_feed = max_per_feed
+        self.batch_size = batch_size
+
+    def discover(self, domain):
+        """
+        Return unseen articles from a domain's feeds.
+
+        Each is (key, url): the canonical URL verdict_cache is keyed on, and
+        the feed's link with its tracking parameters removed, to fetch.
+        """
+        urls = []
+        for feed_url in self.feeds.get(domain, []):
+            try:
+                _, xml_text = self.dispatcher.fetch(feed_url, domain)
+                urls.extend(parse_feed(xml_text))
+            except (requests.RequestException, ET.ParseError) as e:
+                log.warning("feed %s failed: %s", feed_url, e)
+        keys = [canonical_url(url) for url in urls]
+        aliases = db.get_url_aliases(keys)
+        links = {}
+        for key, url in zip(keys, urls):
+            links.setdefault(aliases.get(key, key), strip_tracking(url))
+        return [(key, links[key]) for key in db.filter_uncached_urls(list(links))[:self.max_per_feed]]
+
+    def scrape_domain(self, domain):
+        """Scrape a domain's new articles sequentially through the dispatcher."""
+        parser = PARSER_MAP[domain]
+        articles = []
+        aliases = []
+        for url, link in self.discover(domain):
+            try:
+                final_url, html = self.dispatcher.fetch(link, domain)
+                data = parser(html)
+            except Exception as e:
+                log.warning("scrape %s failed: %s", link, e)
+                continue
+            resolved = resolve_canonical(final_url, html)
+            if resolved != url:
+                aliases.append((url, resolved))
+            articles.append((resolved, domain, data.get("title", ""), data.get("text", "")))
+        if aliases:
+            db.save_url_aliases(aliases)
+        return articles
+
+    def score_and_store(self, articles):
+        """
+        Score articles in batches per language and warm verdict_cache.
+
+        Articles in a language without a model bundle are skipped.
+        """
+        by_language = {}
+        for article in articles:
+            by_language.setdefault(language.detect(article[2], article[3]), []).append(article)
+        for lang, group in by_language.items():
+            if lang == language.ENGLISH:
+                models, calibration = self.models, None
+            else:
+                models, calibration = language.load_bundle(lang), language.bundle_calibration(lang)
+            if models is None:
+                log.info("skipped %d articles in unsupported language %s", len(group), lang)
+                continue
+            self._score_batches(models, group, calibration)
+
+    def _score_batches(self, models, articles, calibration=None):
+        for i in range(0, len(articles), self.batch_size):
+            batch = articles[i:i + self.batch_size]
+            urls, domains, titles, texts = (list(col) for col in zip(*batch))
+            adjustments = scoring.DOMAIN_ADJUSTMENTS
+            if self.domain_index is not None:
+                adjustments = self.domain_index.adjustments(domains, base=adjustments)
+            results = scoring.score_batch(models, titles, texts, domains, adjustments, calibration)
+            db.cache_verdicts([
+                (url, title, r["verdict"], r["satire_prob"], r["fake_prob"], text)
+                for url, title, text, r in zip(urls, titles, texts, results)
+            ])
+
+    def crawl_once(self):
+        """Run one pass over every feed. Returns the number of articles scored."""
+        with ThreadPoolExecutor(max_workers=max(1, len(self.feeds))) as pool:
+            per_domain = list(pool.map(self.scrape_domain, self.feeds))
+        articles = [a for batch in per_domain for a in batch]
+        self.score_and_store(articles)
+        log.info("scored %d new articles", len(articles))
+        return len(articles)
+
+    def run(self, interval=POLL_INTERVAL):
+        while True:
+            started = time.monotonic()
+            try:
+                self.crawl_once()
+            except Exception:
+                log.exception("crawl pass failed")
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--once", action="store_true", help="run a single pass and exit")
+    parser.add_argument("--feeds", help="JSON file mapping scraper domain to feed URLs")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL)
+    parser.add_argument("--rate", type=float, default=CRAWL_RATE,
+                        help="requests/s per site (default: %(default)s)")
+    parser.add_argument("--max-per-feed", type=int, default=MAX_PER_FEED)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    db.init_db()
+
+    feeds = FEEDS
+    if args.feeds:
+        with open(args.feeds, encoding="utf-8") as f:
+            feeds = json.load(f)
+    unknown = set(feeds) - set(PARSER_MAP)
+    if unknown:
+        parser.error(f"no scraper for: {', '.join(sorted(unknown))}")
+
+    crawler = Crawler(
+        scoring.load_models(),
+        feeds=feeds,
+        dispatcher=ScrapeDispatcher(rate=args.rate, burst=1),
+        domain_index=DomainIndex().load(),
+        max_per_feed=args.max_per_feed,
+    )
+    if args.once:
+        crawler.crawl_once()
+    else:
+        crawler.run(args.interval)
+
+
+if __name__ == "__main__":
+    main()
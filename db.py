@@ -6,12 +6,169 @@ Created on Mon Jan 19 13:18:43 2026
 """
 
 # db.py
+import hashlib
+import secrets
 import sqlite3
+import threading
+import zlib
+
+from urls import normalize_netloc
 
 DB_FILE = "app_data.db"
 
-def init_db():
+# Secondary indexes on history, dropped and rebuilt around bulk imports
+HISTORY_INDEXES = {
+    "idx_history_user": "CREATE INDEX IF NOT EXISTS idx_history_user ON history (user_id, id)",
+    # Lets the article_blobs GC triggers find other references to a blob
+    "idx_history_body": "CREATE INDEX IF NOT EXISTS idx_history_body ON history (body_hash)",
+}
+
+# Article bodies are stored once per distinct text in article_blobs, keyed
+# by SHA-256, and referenced from history.body_hash. Each blob is the
+# compressed UTF-8 text prefixed with a one-byte codec tag.
+CODEC_ZLIB = b"\x01"
+CODEC_ZSTD = b"\x02"
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# zstd compressor and decompressor objects must not be shared between
+# threads (Streamlit sessions, the API, the crawler's pool), so each
+# thread gets its own pair
+_zstd = threading.local()
+
+def _zstd_codec():
+    if not hasattr(_zstd, "compressor"):
+        _zstd.compressor = zstandard.ZstdCompressor(level=6)
+        _zstd.decompressor = zstandard.ZstdDecompressor()
+    return _zstd
+
+# A blob is deleted as soon as no history row references it any more
+BLOB_GC_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS article_blobs_gc_delete AFTER DELETE ON history
+    WHEN old.body_hash IS NOT NULL BEGIN
+        DELETE FROM article_blobs WHERE hash = old.body_hash
+            AND NOT EXISTS (SELECT 1 FROM history WHERE body_hash = old.body_hash);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS article_blobs_gc_update AFTER UPDATE OF body_hash ON history
+    WHEN old.body_hash IS NOT NULL AND old.body_hash IS NOT new.body_hash BEGIN
+        DELETE FROM article_blobs WHERE hash = old.body_hash
+            AND NOT EXISTS (SELECT 1 FROM history WHERE body_hash = old.body_hash);
+    END
+    """,
+)
+
+# Full-text index over history title and article text. The table is
+# contentless (the text lives compressed in article_blobs), so rows are
+# added by index_history_text() in the same transaction as their history
+# insert; nothing depends on connect()'s unzip_text(), and plain sqlite3
+# connections can still write history. SQLite 3.43+ can delete from a
+# contentless table by rowid, so a trigger removes deleted rows. Older
+# versions leave them in the index, where the join in search_history()
+# drops them (AUTOINCREMENT ids are never reused).
+FTS_CONTENTLESS_DELETE = sqlite3.sqlite_version_info >= (3, 43, 0)
+HISTORY_FTS_TABLE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(title, body, content=''"
+    + (", contentless_delete=1" if FTS_CONTENTLESS_DELETE else "")
+    + ", tokenize='unicode61 remove_diacritics 2')"
+)
+HISTORY_FTS_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS history_fts_purge AFTER DELETE ON history BEGIN
+        DELETE FROM history_fts WHERE rowid = old.id;
+    END
+    """,
+) if FTS_CONTENTLESS_DELETE else ()
+
+# Triggers from earlier schemas: history_fts_insert/_delete/_update read
+# inline history.text_z, history_fts_ai/_ad/_au called unzip_text()
+LEGACY_FTS_TRIGGERS = (
+    "history_fts_insert", "history_fts_delete", "history_fts_update",
+    "history_fts_ai", "history_fts_ad", "history_fts_au",
+)
+
+def encode_text(text):
+    """
+    Return (hash, blob) for article text, or (None, None) for empty text.
+
+    The hash is the SHA-256 of the UTF-8 text, so identical articles share a blob.
+    """
+    if not text:
+        return None, None
+    raw = text.encode("utf-8")
+    digest = hashlib.sha256(raw).hexdigest()
+    if zstandard is not None:
+        return digest, CODEC_ZSTD + _zstd_codec().compressor.compress(raw)
+    return digest, CODEC_ZLIB + zlib.compress(raw, 6)
+
+def decompress_text(blob):
+    if blob is None:
+        return ""
+    blob = bytes(blob)
+    codec, data = blob[:1], blob[1:]
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("article blob is zstd-compressed: pip install zstandard")
+        return _zstd_codec().decompressor.decompress(data).decode("utf-8")
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data).decode("utf-8")
+    # Untagged: inline history.text_z from before the blob store
+    return zlib.decompress(blob).decode("utf-8")
+
+def store_text(c, text):
+    """Insert text into article_blobs unless already present; returns its hash."""
+    digest, blob = encode_text(text)
+    if digest is not None:
+        c.execute("INSERT OR IGNORE INTO article_blobs (hash, body) VALUES (?, ?)", (digest, blob))
+    return digest
+
+def index_history_text(c, rows):
+    """Add (history id, title, text) rows to history_fts, inside the transaction that inserted them."""
+    c.executemany(
+        "INSERT INTO history_fts (rowid, title, body) VALUES (?, ?, ?)",
+        [(history_id, title, text or "") for history_id, title, text in rows],
+    )
+
+def connect():
     conn = sqlite3.connect(DB_FILE)
+    conn.create_function("unzip_text", 1, decompress_text, deterministic=True)
+    return conn
+
+def _ensure_column(c, table, column, definition):
+    """Add a column to an existing table created before the column existed."""
+    c.execute(f"PRAGMA table_info({table})")
+    if column not in {row[1] for row in c.fetchall()}:
+        c.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+def _migrate_inline_text(c):
+    """
+    Move article text stored inline in history.text_z into article_blobs.
+
+    Returns True if anything changed and the FTS index must be rebuilt.
+    """
+    c.execute("SELECT name FROM sqlite_master WHERE type='trigger'")
+    legacy_triggers = [row[0] for row in c.fetchall() if row[0] in LEGACY_FTS_TRIGGERS]
+    for name in legacy_triggers:
+        c.execute(f"DROP TRIGGER {name}")
+
+    c.execute("PRAGMA table_info(history)")
+    if "text_z" not in {row[1] for row in c.fetchall()}:
+        return bool(legacy_triggers)
+
+    c.execute("SELECT id, text_z FROM history WHERE text_z IS NOT NULL")
+    rows = c.fetchall()
+    for history_id, text_z in rows:
+        digest = store_text(c, decompress_text(text_z))
+        c.execute("UPDATE history SET body_hash=?, text_z=NULL WHERE id=?", (digest, history_id))
+    return bool(legacy_triggers or rows)
+
+def init_db():
+    conn = connect()
     c = conn.cursor()
     # Users table
     c.execute("""
@@ -32,14 +189,114 @@ def init_db():
             satire_prob REAL,
             fake_prob REAL,
             timestamp TEXT NOT NULL,
+            body_hash TEXT,
+            index_verdict TEXT,
+            FOREIGN KEY(user_id) REFERENCES users(id),
+            FOREIGN KEY(body_hash) REFERENCES article_blobs(hash)
+        )
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS article_blobs (
+            hash TEXT PRIMARY KEY,
+            body BLOB NOT NULL
+        ) WITHOUT ROWID
+    """)
+    _ensure_column(c, "history", "body_hash", "TEXT")
+    # Model verdict before the domain index's shifts, counted by domain_index.py
+    _ensure_column(c, "history", "index_verdict", "TEXT")
+    for statement in HISTORY_INDEXES.values():
+        c.execute(statement)
+    # Full-text search over history
+    c.execute("SELECT sql FROM sqlite_master WHERE name='history_fts'")
+    row = c.fetchone()
+    rebuild_fts = row is None
+    if row is not None and FTS_CONTENTLESS_DELETE and "contentless_delete" not in row[0]:
+        # Created by an older SQLite: recreate so deletes can be applied
+        c.execute("DROP TABLE history_fts")
+        rebuild_fts = True
+    c.execute(HISTORY_FTS_TABLE)
+    rebuild_fts = _migrate_inline_text(c) or rebuild_fts
+    c.execute("SELECT 1 FROM sqlite_master WHERE name='article_blobs_gc_delete'")
+    if c.fetchone() is None:
+        # Blobs orphaned before the GC triggers existed
+        c.execute("""
+            DELETE FROM article_blobs
+            WHERE hash NOT IN (SELECT body_hash FROM history WHERE body_hash IS NOT NULL)
+        """)
+    for statement in BLOB_GC_TRIGGERS:
+        c.execute(statement)
+    for statement in HISTORY_FTS_TRIGGERS:
+        c.execute(statement)
+    if rebuild_fts:
+        c.execute("INSERT INTO history_fts (history_fts) VALUES ('delete-all')")
+        c.execute("""
+            INSERT INTO history_fts (rowid, title, body)
+            SELECT h.id, h.title, unzip_text(b.body)
+            FROM history h LEFT JOIN article_blobs b ON b.hash = h.body_hash
+        """)
+    # Domain reputation snapshot (see domain_index.py)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS domain_stats (
+            domain TEXT PRIMARY KEY,
+            total INTEGER NOT NULL,
+            satire INTEGER NOT NULL,
+            fake INTEGER NOT NULL,
+            unverified INTEGER NOT NULL,
+            real INTEGER NOT NULL
+        )
+    """)
+    # Pre-scored articles (see crawler.py), keyed by URL
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS verdict_cache (
+            url TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            verdict TEXT NOT NULL,
+            satire_prob REAL,
+            fake_prob REAL,
+            scored_at TEXT NOT NULL,
+            body BLOB
+        )
+    """)
+    # Article text the verdict was scored on, compressed like article_blobs
+    # bodies, so a cache hit still gives history its text
+    _ensure_column(c, "verdict_cache", "body", "BLOB")
+    # Resolved canonical URL per alias (see urls.py), so redirects and
+    # rel=canonical are only followed once per alias
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS url_aliases (
+            alias TEXT PRIMARY KEY,
+            canonical TEXT NOT NULL,
+            resolved_at TEXT NOT NULL
+        )
+    """)
+    # Container selectors learned by scrapers/generic.py, per domain
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS selector_cache (
+            domain TEXT PRIMARY KEY,
+            selector TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+    """)
+    # API keys (see api.py); only a SHA-256 of each key is stored
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS api_keys (
+            key_hash TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            created_at TEXT NOT NULL,
             FOREIGN KEY(user_id) REFERENCES users(id)
         )
     """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS snapshots (
+            name TEXT PRIMARY KEY,
+            last_history_id INTEGER NOT NULL
+        )
+    """)
     conn.commit()
     conn.close()
 
 def add_user(username, password):
-    conn = sqlite3.connect(DB_FILE)
+    conn = connect()
     c = conn.cursor()
     try:
         c.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, password))
@@ -51,7 +308,7 @@ def add_user(username, password):
         conn.close()
 
 def validate_user(username, password):
-    conn = sqlite3.connect(DB_FILE)
+    conn = connect()
     c = conn.cursor()
     c.execute("SELECT id FROM users WHERE username=? AND password=?", (username, password))
     result = c.fetchone()
@@ -60,8 +317,39 @@ def validate_user(username, password):
         return result[0]  # user_id
     return None
 
+def _key_hash(api_key):
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+def create_api_key(user_id):
+    """Create and return a new API key for user_id. Only its hash is stored."""
+    api_key = secrets.token_urlsafe(32)
+    conn = connect()
+    c = conn.cursor()
+    c.execute("""
+        INSERT INTO api_keys (key_hash, user_id, created_at) VALUES (?, ?, datetime('now'))
+    """, (_key_hash(api_key), user_id))
+    conn.commit()
+    conn.close()
+    return api_key
+
+def get_api_key_user(api_key):
+    """Return the user_id an API key belongs to, or None."""
+    conn = connect()
+    c = conn.cursor()
+    c.execute("SELECT user_id FROM api_keys WHERE key_hash=?", (_key_hash(api_key),))
+    result = c.fetchone()
+    conn.close()
+    return result[0] if result else None
+
+def delete_api_key(api_key):
+    conn = connect()
+    c = conn.cursor()
+    c.execute("DELETE FROM api_keys WHERE key_hash=?", (_key_hash(api_key),))
+    conn.commit()
+    conn.close()
+
 def get_user_history(user_id):
-    conn = sqlite3.connect(DB_FILE)
+    conn = connect()
     c = conn.cursor()
     c.execute("""
         SELECT url, title, verdict, satire_prob, fake_prob, timestamp 
@@ -72,12 +360,230 @@ def get_user_history(user_id):
     conn.close()
     return rows
 
-def add_history(user_id, url, title, verdict, satire_prob, fake_prob):
-    conn = sqlite3.connect(DB_FILE)
+def get_history_version(user_id):
+    """
+    Id of the user's newest history row, 0 if none.
+
+    One lookup on idx_history_user. Pages key their caches on it, so rows
+    written from any session, process or the API show up on the next rerun.
+    """
+    conn = connect()
+    c = conn.cursor()
+    c.execute("SELECT MAX(id) FROM history WHERE user_id=?", (user_id,))
+    version = c.fetchone()[0] or 0
+    conn.close()
+    return version
+
+def add_history(user_id, url, title, verdict, satire_prob, fake_prob, text=None, index_verdict=None):
+    conn = connect()
+    c = conn.cursor()
+    body_hash = store_text(c, text)
+    c.execute("""
+        INSERT INTO history (user_id, url, title, verdict, satire_prob, fake_prob, timestamp, body_hash,
+                             index_verdict)
+        VALUES (?, ?, ?, ?, ?, ?, datetime('now'), ?, ?)
+    """, (user_id, url, title, verdict, satire_prob, fake_prob, body_hash, index_verdict))
+    history_id = c.lastrowid
+    index_history_text(c, [(history_id, title, text)])
+    conn.commit()
+    conn.close()
+    return history_id
+
+DOMAIN_VERDICTS = ("satire", "fake", "unverified", "real")
+
+def fold_domain_stats(chunk_size=1000):
+    """
+    Add history rows newer than the domain_stats high-water mark to
+    domain_stats, then return the whole table.
+
+    Only rows with an index_verdict are counted. The fold runs under one
+    write lock, so every process writing history can call it and each
+    row is counted exactly once.
+
+    Returns:
+        tuple: (rows of (domain, total, satire, fake, unverified, real), last_history_id)
+    """
+    conn = connect()
+    c = conn.cursor()
+    try:
+        c.execute("BEGIN IMMEDIATE")
+        c.execute("SELECT last_history_id FROM snapshots WHERE name='domain_stats'")
+        result = c.fetchone()
+        last_id = result[0] if result else 0
+        c.execute("SELECT COALESCE(MAX(id), 0) FROM history")
+        max_id = max(last_id, c.fetchone()[0])
+
+        deltas = {}
+        c.execute("""
+            SELECT url, index_verdict FROM history
+            WHERE id > ? AND id <= ? AND index_verdict IS NOT NULL
+        """, (last_id, max_id))
+        while True:
+            rows = c.fetchmany(chunk_size)
+            if not rows:
+                break
+            for url, verdict in rows:
+                domain = normalize_netloc(url)
+                if domain and verdict in DOMAIN_VERDICTS:
+                    counts = deltas.setdefault(domain, dict.fromkeys(DOMAIN_VERDICTS, 0))
+                    counts[verdict] += 1
+        c.executemany("""
+            INSERT INTO domain_stats (domain, total, satire, fake, unverified, real)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(domain) DO UPDATE SET
+                total = total + excluded.total,
+                satire = satire + excluded.satire,
+                fake = fake + excluded.fake,
+                unverified = unverified + excluded.unverified,
+                real = real + excluded.real
+        """, [
+            (domain, sum(counts.values()), *(counts[v] for v in DOMAIN_VERDICTS))
+            for domain, counts in deltas.items()
+        ])
+        c.execute("""
+            INSERT OR REPLACE INTO snapshots (name, last_history_id) VALUES ('domain_stats', ?)
+        """, (max_id,))
+        conn.commit()
+
+        c.execute("SELECT domain, total, satire, fake, unverified, real FROM domain_stats")
+        return c.fetchall(), max_id
+    finally:
+        conn.close()
+
+def get_cached_verdict(url):
+    """Return (title, verdict, satire_prob, fake_prob, text) for a pre-scored URL, or None."""
+    conn = connect()
+    c = conn.cursor()
+    c.execute("""
+        SELECT title, verdict, satire_prob, fake_prob, unzip_text(body)
+        FROM verdict_cache WHERE url=?
+    """, (url,))
+    result = c.fetchone()
+    conn.close()
+    return result
+
+def filter_uncached_urls(urls):
+    """Return the subset of urls that have no verdict_cache entry, in order."""
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return []
+    conn = connect()
+    c = conn.cursor()
+    cached = set()
+    # Stay under SQLite's host-parameter limit
+    for i in range(0, len(urls), 500):
+        chunk = urls[i:i + 500]
+        c.execute(
+            f"SELECT url FROM verdict_cache WHERE url IN ({','.join('?' * len(chunk))})",
+            chunk,
+        )
+        cached.update(row[0] for row in c.fetchall())
+    conn.close()
+    return [url for url in urls if url not in cached]
+
+def cache_verdicts(rows):
+    """Upsert (url, title, verdict, satire_prob, fake_prob, text) rows into verdict_cache."""
+    conn = connect()
+    c = conn.cursor()
+    c.executemany("""
+        INSERT OR REPLACE INTO verdict_cache (url, title, verdict, satire_prob, fake_prob, scored_at, body)
+        VALUES (?, ?, ?, ?, ?, datetime('now'), ?)
+    """, [row[:5] + (encode_text(row[5])[1],) for row in rows])
+    conn.commit()
+    conn.close()
+
+def get_url_aliases(urls):
+    """Return {alias: canonical} for the given URLs that have a resolved alias."""
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return {}
+    conn = connect()
+    c = conn.cursor()
+    aliases = {}
+    for i in range(0, len(urls), 500):
+        chunk = urls[i:i + 500]
+        c.execute(
+            f"SELECT alias, canonical FROM url_aliases WHERE alias IN ({','.join('?' * len(chunk))})",
+            chunk,
+        )
+        aliases.update(c.fetchall())
+    conn.close()
+    return aliases
+
+def save_url_aliases(pairs):
+    """Upsert (alias, canonical) pairs into url_aliases."""
+    conn = connect()
+    c = conn.cursor()
+    c.executemany("""
+        INSERT OR REPLACE INTO url_aliases (alias, canonical, resolved_at)
+        VALUES (?, ?, datetime('now'))
+    """, pairs)
+    conn.commit()
+    conn.close()
+
+def get_learned_selector(domain):
+    conn = connect()
+    c = conn.cursor()
+    c.execute("SELECT selector FROM selector_cache WHERE domain=?", (domain,))
+    result = c.fetchone()
+    conn.close()
+    return result[0] if result else None
+
+def save_learned_selector(domain, selector):
+    conn = connect()
     c = conn.cursor()
     c.execute("""
-        INSERT INTO history (user_id, url, title, verdict, satire_prob, fake_prob, timestamp)
-        VALUES (?, ?, ?, ?, ?, ?, datetime('now'))
-    """, (user_id, url, title, verdict, satire_prob, fake_prob))
+        INSERT OR REPLACE INTO selector_cache (domain, selector, updated_at)
+        VALUES (?, ?, datetime('now'))
+    """, (domain, selector))
+    conn.commit()
+    conn.close()
+
+def delete_learned_selector(domain):
+    conn = connect()
+    c = conn.cursor()
+    c.execute("DELETE FROM selector_cache WHERE domain=?", (domain,))
     conn.commit()
     conn.close()
+
+def _fts_query(query):
+    """Quote each word so user input is matched literally, not as FTS5 syntax."""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+
+def search_history(query, user_id, limit=20):
+    """
+    Rank one user's history rows matching query by BM25 over title (weighted 2x) and text.
+
+    Returns:
+        List[tuple]: (id, url, title, verdict, satire_prob, fake_prob, timestamp, score),
+        best match first
+    """
+    match = _fts_query(query)
+    if not match:
+        return []
+    conn = connect()
+    c = conn.cursor()
+    c.execute("""
+        SELECT h.id, h.url, h.title, h.verdict, h.satire_prob, h.fake_prob, h.timestamp,
+               bm25(history_fts, 2.0, 1.0) AS score
+        FROM history_fts
+        JOIN history h ON h.id = history_fts.rowid
+        WHERE history_fts MATCH ? AND h.user_id = ?
+        ORDER BY score LIMIT ?
+    """, (match, user_id, limit))
+    rows = c.fetchall()
+    conn.close()
+    return rows
+
+def get_article_text(history_id):
+    """Decompress and return the article text for one history row ("" if none stored)."""
+    conn = connect()
+    c = conn.cursor()
+    c.execute("""
+        SELECT b.body FROM history h
+        JOIN article_blobs b ON b.hash = h.body_hash
+        WHERE h.id = ?
+    """, (history_id,))
+    result = c.fetchone()
+    conn.close()
+    return decompress_text(result[0]) if result else ""
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+Per-domain reputation index built from the history table.
+
+Counts are held in memory keyed by normalized netloc and updated as each
+analysis is saved. Only model verdicts count, taken before the index's own
+shifts (history.index_verdict), so the index never learns from verdicts it
+produced or nudged. Every few updates the snapshot folds new history rows
+into the domain_stats table in SQL and reloads it, so the counts are shared
+by every process that writes history (the page, the API) and survive a
+restart.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+import db
+import scoring
+
+VERDICTS = db.DOMAIN_VERDICTS
+
+# Beta smoothing strength: a domain needs roughly this many analyses before
+# its own rates outweigh the global rates.
+PRIOR_STRENGTH = 10.0
+
+# Learned log-odds shifts are damped and capped so the index nudges the models
+# rather than overriding them.
+SHIFT_WEIGHT = 0.5
+MAX_SHIFT = 2.0
+
+KNOWN_MIN_COUNT = 25
+KNOWN_MIN_RATE = 0.95
+
+_EPS = 1e-6
+
+
+def _logit(p):
+    p = min(max(p, _EPS), 1 - _EPS)
+    return float(np.log(p / (1 - p)))
+
+
+class DomainIndex:
+    """
+    In-memory per-domain verdict counts, periodically merged with domain_stats.
+
+    Args:
+        snapshot_every (int): snapshot after this many recorded analyses
+        snapshot_interval (float): or after this many seconds, whichever first
+    """
+
+    def __init__(self, snapshot_every=50, snapshot_interval=300.0):
+        self.snapshot_every = snapshot_every
+        self.snapshot_interval = snapshot_interval
+        self._counts = {}
+        self._totals = dict.fromkeys(VERDICTS, 0)
+        self._total = 0
+        # (history_id, domain, verdict) recorded here since the last snapshot
+        self._recent = []
+        self._pending = 0
+        self._last_snapshot = time.monotonic()
+        self._lock = threading.Lock()
+
+    # ------------------------------
+    # LOADING
+    # ------------------------------
+    def load(self):
+        """Fold new history rows into domain_stats and load it."""
+        self.snapshot()
+        return self
+
+    def _count(self, domain, verdict):
+        counts = self._counts.setdefault(domain, dict.fromkeys(VERDICTS + ("total",), 0))
+        counts[verdict] += 1
+        counts["total"] += 1
+        self._totals[verdict] += 1
+        self._total += 1
+
+    # ------------------------------
+    # UPDATES
+    # ------------------------------
+    def record(self, domain, verdict, history_id, snapshot=True):
+        """
+        Count one saved analysis of a normalized netloc.
+
+        verdict is the history row's index_verdict; the row itself is what
+        the next snapshot adds to domain_stats.
+        """
+        if not domain or verdict not in VERDICTS:
+            return
+        with self._lock:
+            self._count(domain, verdict)
+            self._recent.append((history_id, domain, verdict))
+            self._pending += 1
+            due = (
+                self._pending >= self.snapshot_every
+                or time.monotonic() - self._last_snapshot >= self.snapshot_interval
+            )
+        if snapshot and due:
+            self.snapshot()
+
+    def snapshot(self):
+        """Fold new history rows into domain_stats and reload the counts from it."""
+        rows, last_id = db.fold_domain_stats()
+        with self._lock:
+            self._counts.clear()
+            self._totals = dict.fromkeys(VERDICTS, 0)
+            self._total = 0
+            for domain, total, *per_verdict in rows:
+                counts = dict(zip(VERDICTS, per_verdict))
+                counts["total"] = total
+                self._counts[domain] = counts
+                self._total += total
+                for verdict in VERDICTS:
+                    self._totals[verdict] += counts[verdict]
+            # Analyses saved while the fold ran are counted by the next one
+            self._recent = [entry for entry in self._recent if entry[0] > last_id]
+            for _, domain, verdict in self._recent:
+                self._count(domain, verdict)
+            self._pending = 0
+            self._last_snapshot = time.monotonic()
+
+    # ------------------------------
+    # QUERIES
+    # ------------------------------
+    def get(self, domain):
+        """Return a copy of the raw counts for a normalized netloc, or None."""
+        counts = self._counts.get(domain)
+        return dict(counts) if counts else None
+
+    def base_rates(self):
+        """
+        Global smoothed (satire, fake) rates; fake is conditional on not
+        being satire, like the per-domain rate in priors().
+        """
+        satire = (self._totals["satire"] + 1.0) / (self._total + 2.0)
+        fake = (self._totals["fake"] + 1.0) / (self._total - self._totals["satire"] + 2.0)
+        return satire, fake
+
+    def priors(self, domain):
+        """
+        Bayesian-smoothed (satire, fake) rates for a domain.
+
+        Unknown domains get the global rates.
+        """
+        counts = self._counts.get(domain)
+        base_satire, base_fake = self.base_rates()
+        if not counts:
+            return base_satire, base_fake
+        n = counts["total"]
+        satire = (counts["satire"] + PRIOR_STRENGTH * base_satire) / (n + PRIOR_STRENGTH)
+        # Fake rate is conditional on not being satire, matching scoring.joint().
+        non_satire = n - counts["satire"]
+        fake = (counts["fake"] + PRIOR_STRENGTH * base_fake) / (non_satire + PRIOR_STRENGTH)
+        return satire, fake
+
+    def adjustments(self, domains, base=None):
+        """
+        Build a scoring.fuse() adjustments table for the given domains.
+
+        Learned shifts are added on top of the static entries in base.
+        """
+        base_satire, base_fake = self.base_rates()
+        learned = {}
+        for domain in set(domains):
+            if not domain or domain not in self._counts:
+                continue
+            satire, fake = self.priors(domain)
+            satire_shift = SHIFT_WEIGHT * (_logit(satire) - _logit(base_satire))
+            fake_shift = SHIFT_WEIGHT * (_logit(fake) - _logit(base_fake))
+            learned[domain] = (
+                float(np.clip(satire_shift, -MAX_SHIFT, MAX_SHIFT)),
+                float(np.clip(fake_shift, -MAX_SHIFT, MAX_SHIFT)),
+            )
+        return scoring.combine_adjustments(base or {}, learned)
+
+    def known_verdict(self, domain, min_count=KNOWN_MIN_COUNT, min_rate=KNOWN_MIN_RATE):
+        """Return the dominant verdict when a domain is overwhelmingly one class, else None."""
+        counts = self._counts.get(domain)
+        if not counts or counts["total"] < min_count:
+            return None
+        verdict = max(VERDICTS, key=counts.get)
+        if counts[verdict] / counts["total"] >= min_rate:
+            return verdict
+        return None
+
+    def short_circuit(self, domain):
+        """
+        Score an overwhelmingly known domain from its priors alone.
+
+        Returns:
+            Dict | None: a scoring.build_results() entry, or None when the
+            domain is not known well enough (or its priors disagree with
+            its dominant verdict) and the models should run.
+        """
+        known = self.known_verdict(domain)
+        if known is None:
+            return None
+        satire, fake = self.priors(domain)
+        result = scoring.build_results(scoring.joint([satire], [fake]))[0]
+        return result if result["verdict"] == known else None
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming export and bulk import of the history table.
+
+Exports read the table through a chunked cursor and write each chunk
+straight out, so memory stays flat however large the table is. Parquet
+needs pyarrow; gzip-compressed CSV works with the standard library.
+
+Usage:
+    python history_io.py export history.parquet
+    python history_io.py export history.csv.gz
+    python history_io.py import history.parquet [--keep-ids]
+"""
+
+import argparse
+import csv
+import gzip
+
+import db
+
+COLUMNS = ("id", "user_id", "url", "title", "verdict", "satire_prob", "fake_prob", "timestamp", "text")
+# Column expressions read from history h / article_blobs b, in COLUMNS order
+SELECT_COLUMNS = tuple(f"h.{name}" for name in COLUMNS[:-1]) + ("unzip_text(b.body)",)
+CHUNK_SIZE = 10000
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Parquet support needs pyarrow: pip install pyarrow")
+    return pyarrow, pyarrow.parquet
+
+
+def _is_parquet(path):
+    return path.endswith((".parquet", ".pq"))
+
+
+def _open_text(path, mode):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+# ------------------------------
+# EXPORT
+# ------------------------------
+def iter_history_chunks(conn, chunk_size=CHUNK_SIZE):
+    c = conn.cursor()
+    c.execute(f"""
+        SELECT {', '.join(SELECT_COLUMNS)}
+        FROM history h LEFT JOIN article_blobs b ON b.hash = h.body_hash
+        ORDER BY h.id
+    """)
+    while True:
+        rows = c.fetchmany(chunk_size)
+        if not rows:
+            break
+        yield rows
+
+
+def _parquet_schema(pa):
+    return pa.schema([
+        ("id", pa.int64()),
+        ("user_id", pa.string()),
+        ("url", pa.string()),
+        ("title", pa.string()),
+        ("verdict", pa.dictionary(pa.int8(), pa.string())),
+        ("satire_prob", pa.float64()),
+        ("fake_prob", pa.float64()),
+        ("timestamp", pa.string()),
+        ("text", pa.large_string()),
+    ])
+
+
+def export_history(path, chunk_size=CHUNK_SIZE):
+    """Stream the history table to Parquet or (gzipped) CSV. Returns the row count."""
+    conn = db.connect()
+    count = 0
+    try:
+        if _is_parquet(path):
+            pa, pq = _require_pyarrow()
+            schema = _parquet_schema(pa)
+            with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+                for rows in iter_history_chunks(conn, chunk_size):
+                    columns = list(zip(*rows))
+                    # user_id is INTEGER in db.py but TEXT in older databases
+                    columns[1] = [None if v is None else str(v) for v in columns[1]]
+                    batch = pa.RecordBatch.from_arrays(
+                        [pa.array(col, type=field.type) if field.name != "verdict"
+                         else pa.array(col).dictionary_encode()
+                         for col, field in zip(columns, schema)],
+                        schema=schema,
+                    )
+                    writer.write_batch(batch)
+                    count += len(rows)
+        else:
+            with _open_text(path, "w") as f:
+                writer = csv.writer(f)
+                writer.writerow(COLUMNS)
+                for rows in iter_history_chunks(conn, chunk_size):
+                    writer.writerows(rows)
+                    count += len(rows)
+    finally:
+        conn.close()
+    return count
+
+
+# ------------------------------
+# IMPORT
+# ------------------------------
+def _iter_file_chunks(path, chunk_size):
+    if _is_parquet(path):
+        _, pq = _require_pyarrow()
+        parquet = pq.ParquetFile(path)
+        present = [name for name in COLUMNS if name in parquet.schema_arrow.names]
+        for batch in parquet.iter_batches(batch_size=chunk_size, columns=present):
+            columns = {name: batch.column(name).to_pylist() for name in present}
+            yield [
+                [columns[name][i] if name in columns else None for name in COLUMNS]
+                for i in range(batch.num_rows)
+            ]
+        return
+
+    with _open_text(path, "r") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        # Exports made before article text was stored have no text column
+        order = [header.index(name) if name in header else None for name in COLUMNS]
+        chunk = []
+        for record in reader:
+            row = [record[i] if i is not None else "" for i in order]
+            # CSV loses types: restore ids and probabilities
+            row[0] = int(row[0]) if row[0] else None
+            row[5] = float(row[5]) if row[5] else None
+            row[6] = float(row[6]) if row[6] else None
+            row[2] = row[2] or None
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def _rows_to_insert(c, rows, keep_ids):
+    """
+    The rows of a chunk that import_history() inserts, each with its history id.
+
+    Rows missing a NOT NULL column are dropped, and with keep_ids so are
+    rows whose id is already taken.
+    """
+    rows = [list(row) for row in rows if None not in (row[1], row[3], row[4], row[7])]
+    if keep_ids:
+        by_id = {}
+        for row in rows:
+            if row[0] is not None:
+                by_id.setdefault(row[0], row)
+        ids = list(by_id)
+        # Stay under SQLite's host-parameter limit
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            c.execute(f"SELECT id FROM history WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+            for (history_id,) in c.fetchall():
+                del by_id[history_id]
+        return list(by_id.values())
+
+    # AUTOINCREMENT never reuses ids, so start past both the highest id
+    # ever handed out and the highest id present
+    c.execute("""
+        SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'history'), 0),
+                   COALESCE((SELECT MAX(id) FROM history), 0))
+    """)
+    next_id = c.fetchone()[0] + 1
+    for offset, row in enumerate(rows):
+        row[0] = next_id + offset
+    return rows
+
+
+def import_history(path, keep_ids=False, chunk_size=CHUNK_SIZE):
+    """
+    Bulk-load an exported file into history.
+
+    Secondary indexes are dropped for the load and rebuilt once at the end.
+    With keep_ids, exported row ids are preserved and rows whose id already
+    exists are skipped; otherwise new ids are assigned.
+
+    Returns:
+        int: rows inserted
+    """
+    db.init_db()
+    conn = db.connect()
+    conn.execute("PRAGMA synchronous = OFF")
+    c = conn.cursor()
+    # Every row gets an explicit id (its own with keep_ids, else the next
+    # free one), so rows are inserted in one executemany and still known
+    # for the FTS index and the blob store
+    insert = (
+        f"INSERT INTO history ({', '.join(COLUMNS[:-1])}, body_hash) "
+        f"VALUES ({', '.join('?' * len(COLUMNS))})"
+    )
+    count = 0
+    try:
+        for name in db.HISTORY_INDEXES:
+            c.execute(f"DROP INDEX IF EXISTS {name}")
+        for rows in _iter_file_chunks(path, chunk_size):
+            rows = _rows_to_insert(c, rows, keep_ids)
+            encoded = [db.encode_text(row[-1]) for row in rows]
+            c.executemany(
+                "INSERT OR IGNORE INTO article_blobs (hash, body) VALUES (?, ?)",
+                [pair for pair in encoded if pair[0] is not None],
+            )
+            c.executemany(insert, [row[:-1] + [digest] for row, (digest, _) in zip(rows, encoded)])
+            db.index_history_text(c, [(row[0], row[3], row[-1]) for row in rows])
+            count += len(rows)
+            conn.commit()
+    finally:
+        for statement in db.HISTORY_INDEXES.values():
+            c.execute(statement)
+        c.execute("ANALYZE history")
+        conn.commit()
+        conn.close()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import analysis history")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="write history to .parquet, .csv or .csv.gz")
+    export.add_argument("path")
+    load = sub.add_parser("import", help="load a file written by export")
+    load.add_argument("path")
+    load.add_argument("--keep-ids", action="store_true", help="preserve exported row ids")
+    for p in (export, load):
+        p.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        count = export_history(args.path, args.chunk_size)
+        print(f"Exported {count} rows to {args.path}")
+    else:
+        count = import_history(args.path, args.keep_ids, args.chunk_size)
+        print(f"Imported {count} rows from {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Fast language identification ahead of scoring.
+
+The TF-IDF vocabularies are English, so Pidgin, Yoruba or Hausa articles
+only produce meaningless scores. detect() looks at the first couple of
+thousand characters for script, diacritics and marker words, and
+score_articles() routes each language to its own model bundle: the
+English models already loaded by the caller, or models/<language>/ with
+the same four files as scoring.MODEL_FILES (plus an optional
+scoring.CALIBRATION_FILE), loaded on first use. A language without a
+bundle is flagged as unsupported instead of scored.
+"""
+
+import os
+import re
+import threading
+
+import scoring
+from normalize import normalize_text
+
+ENGLISH = "en"
+UNKNOWN_SCRIPT = "und"
+
+LANGUAGE_NAMES = {
+    "en": "English",
+    "pcm": "Nigerian Pidgin",
+    "yo": "Yoruba",
+    "ha": "Hausa",
+    "und": "Non-Latin script",
+}
+
+BUNDLE_DIR = "models"
+
+SAMPLE_CHARS = 2000     # title plus the start of the body is plenty
+MIN_TOKENS = 8          # shorter samples stay English
+LATIN_SHARE = 0.6       # below this share of Latin letters the script is unsupported
+MARKER_SHARE = 0.08     # share of marker tokens that switches language
+MIN_DISTINCT_MARKERS = 3  # different marker words needed as well, so one repeated word is not enough
+
+# Words that are common in the language and rare in English news copy.
+# Short words that are also English words, names or abbreviations ("fun",
+# "don", "im", "ko", ...) are left out: they turn up in English articles.
+PIDGIN_MARKERS = frozenset({
+    "dey", "wetin", "wey", "una", "dem", "abi", "sef", "sabi", "comot",
+    "pikin", "wahala", "oya", "naim", "shey", "ehn", "gbege", "di",
+    "pesin", "pipo", "tori", "sotey", "kuku", "katakata", "palava",
+    "ogbonge", "belle", "kpatakpata",
+})
+YORUBA_MARKERS = frozenset({
+    "ati", "awon", "awọn", "lati", "wọn",
+    "kò", "sugbon", "ṣugbọn", "naa", "náà", "yii", "yìí", "eyi", "ìyẹn",
+    "ilu", "ìlú", "oba", "ọba", "nigba", "nígbà", "pelu", "pẹlu", "pẹ̀lú",
+})
+HAUSA_MARKERS = frozenset({
+    "cikin", "kuma", "wanda", "amma", "yana", "tana", "ake",
+    "shugaban", "gwamnatin", "wannan", "zuwa", "daga", "domin", "bayan",
+})
+
+_PUNCTUATION = ".,;:!?\"'()[]{}“”‘’«»—–-…*"
+# Letters outside the Latin blocks (Arabic, Cyrillic, ...)
+_NON_LATIN = re.compile(r"[^\W\d_A-Za-z\u00C0-\u024F\u1E00-\u1EFF]")
+# Under-dotted vowels and s, or the combining dot below: distinctly Yoruba
+_YORUBA_LETTER = re.compile("[\u1eb9\u1ecd\u1e63\u0323]")
+# Hooked consonants: distinctly Hausa
+_HAUSA_LETTER = re.compile("[\u0253\u0257\u0199\u01b4]")
+
+_bundles = {}
+_calibrations = {}
+_bundles_lock = threading.Lock()
+
+
+# ------------------------------
+# DETECTION
+# ------------------------------
+def detect(title, text):
+    """
+    Return the language code for an article: "en", "pcm", "yo", "ha" or
+    "und" (non-Latin script). Short or ambiguous samples are English.
+    """
+    # Normalized first so homoglyph-laden English is not taken for another script
+    sample = normalize_text(f"{title or ''} {text or ''}"[:SAMPLE_CHARS]).lower()
+    tokens = [word.strip(_PUNCTUATION) for word in sample.split()]
+
+    # Set lookups via map() keep this well under a millisecond; ASCII
+    # samples (most English copy) skip the character-class scans entirely
+    yoruba_words = hausa_words = ()
+    if not sample.isascii():
+        letters = sum(map(len, tokens))
+        if len(_NON_LATIN.findall(sample)) > (1 - LATIN_SHARE) * letters:
+            return UNKNOWN_SCRIPT
+        if len(tokens) < MIN_TOKENS:
+            return ENGLISH
+        accented = [token for token in tokens if not token.isascii()]
+        yoruba_words = [
+            token for token in accented if token not in YORUBA_MARKERS and _YORUBA_LETTER.search(token)
+        ]
+        hausa_words = [
+            token for token in accented if token not in HAUSA_MARKERS and _HAUSA_LETTER.search(token)
+        ]
+
+    elif len(tokens) < MIN_TOKENS:
+        return ENGLISH
+
+    counts = (
+        ("pcm",) + _marker_hits(tokens, PIDGIN_MARKERS),
+        ("yo",) + _marker_hits(tokens, YORUBA_MARKERS, yoruba_words),
+        ("ha",) + _marker_hits(tokens, HAUSA_MARKERS, hausa_words),
+    )
+    best, count, distinct = max(counts, key=lambda hits: hits[1])
+    if count / len(tokens) < MARKER_SHARE or distinct < MIN_DISTINCT_MARKERS:
+        return ENGLISH
+    return best
+
+
+def _marker_hits(tokens, markers, letter_words=()):
+    """(marker tokens, distinct marker words) in tokens; letter_words count as markers too."""
+    count = sum(map(markers.__contains__, tokens)) + len(letter_words)
+    return count, len(markers.intersection(tokens)) + len(set(letter_words))
+
+
+# ------------------------------
+# MODEL BUNDLES
+# ------------------------------
+def bundle_dir(lang):
+    return os.path.join(BUNDLE_DIR, lang)
+
+
+def load_bundle(lang):
+    """
+    Models for a non-English language, loaded on first use.
+
+    Returns:
+        tuple: as scoring.load_models(), or None when models/<lang>/ does
+        not have all four files
+    """
+    with _bundles_lock:
+        if lang not in _bundles:
+            directory = bundle_dir(lang)
+            installed = all(os.path.exists(os.path.join(directory, name)) for name in scoring.MODEL_FILES)
+            _bundles[lang] = scoring.load_models(directory) if installed else None
+            _calibrations[lang] = scoring.load_calibration(directory)
+        return _bundles[lang]
+
+
+def bundle_calibration(lang):
+    """Platt parameters for a bundle loaded by load_bundle()."""
+    load_bundle(lang)
+    return _calibrations[lang]
+
+
+def unsupported_result():
+    """Result for an article whose language has no model bundle."""
+    return {
+        "verdict": "unsupported",
+        "satire_warn": False,
+        "satire_prob": None,
+        "fake_prob": None,
+        "p_satire": None,
+        "p_fake": None,
+        "p_credible": None,
+    }
@@ -5,18 +5,25 @@ Locked until login
 """
 
 import streamlit as st
-import requests
-import joblib
-import numpy as np
-from urllib.parse import urlparse
-import plotly.graph_objects as go
-import sqlite3
-from datetime import datetime
-from db import add_history
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from db import init_db
+import analysis
+import language
+import scoring
+from domain_index import DomainIndex
+from workers import WorkerPool
 
+log = logging.getLogger("main")
 
-init_db()
+@st.cache_resource
+def init_database():
+    # Schema checks and migrations once per server process, not per rerun
+    init_db()
+
+init_database()
 # ------------------------------
 # LOCK PAGE UNTIL LOGIN
 # ------------------------------
@@ -28,76 +35,51 @@ st.title("📰 Fake News Detector")
 st.success(f"✅ Welcome! You are now logged in.")
 
 
-# ------------------------------
-# IMPORT SCRAPERS
-# ------------------------------
-from scrapers.bbc import scrape_bbc_article
-from scrapers.pulse_ng import scrape_pulse_article
-from scrapers.punch import scrape_punch_article
-from scrapers.instablog import scrape_instablog_article
-from scrapers.onion import scrape_onion_article
-from scrapers.fox import scrape_fox_article
-from scrapers.aljazeera import scrape_aljazeera_article
-from scrapers.arise import scrape_arise_tv_article
-from scrapers.channels import scrape_channelstv_article
-from scrapers.sahara import scrape_saharareporters_article
-
-SCRAPER_MAP = {
-    "bbc.com": scrape_bbc_article,
-    "www.pulse.ng": scrape_pulse_article,
-    "pulse.ng": scrape_pulse_article,
-    "punchng.com": scrape_punch_article,
-    "instablog9ja.com": scrape_instablog_article,
-    "theonion.com": scrape_onion_article,
-    "foxnews.com": scrape_fox_article,
-    "arise.tv": scrape_arise_tv_article,
-    "saharareporters.com": scrape_saharareporters_article,
-    "channelstv.com": scrape_channelstv_article,
-    "aljazeera.com": scrape_aljazeera_article
-}
-
 # ------------------------------
 # LOAD MODELS
 # ------------------------------
 @st.cache_resource
 def load_models():
-    return (
-        joblib.load("model.pkl"),
-        joblib.load("vectorizer.pkl"),
-        joblib.load("Satire_model.pkl"),
-        joblib.load("Satire_vectorizer.pkl")
-    )
+    return scoring.load_models()
+
+models = load_models()
 
-model, vectorizer, satire_model, satire_vectorizer = load_models()
+@st.cache_resource
+def load_domain_index():
+    return DomainIndex().load()
 
-SATIRE_HIGH = 0.70
-SATIRE_LOW = 0.40
-FAKE_HIGH = 0.75
-FAKE_UNCERTAIN = 0.55
+domain_index = load_domain_index()
+
+@st.cache_resource
+def load_worker_pool():
+    return WorkerPool(models=models)
+
+worker_pool = load_worker_pool()
+
+@st.cache_resource
+def load_background_executor():
+    # Scrapes and history writes run here so the page can render meanwhile
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="analyze")
+
+background = load_background_executor()
 
 # ------------------------------
 # UTILITY FUNCTIONS
 # ------------------------------
-def predict_satire_prob(title, text):
-    X = satire_vectorizer.transform([f"{title}. {text}"])
-    if hasattr(satire_model, "predict_proba"):
-        return satire_model.predict_proba(X)[0][1]
-    else:
-        score = satire_model.decision_function(X)[0]
-        return 1 / (1 + np.exp(-score))
-
-def predict_fake_prob(title, text):
-    X = vectorizer.transform([f"{title}. {text}"])
-    return model.predict_proba(X)[0][1]
-
-def plot_probability_pie(satire_prob, fake_prob):
-    credible_prob = max(0, 1 - satire_prob - fake_prob)
+def probability_pie(result):
+    # Imported on first use: plotly is only needed once a verdict is on screen
+    import plotly.graph_objects as go
     labels = ["Satire", "Fake", "Credible"]
-    values = [satire_prob, fake_prob, credible_prob]
+    values = [result["p_satire"], result["p_fake"], result["p_credible"]]
     colors = ["#FF6B6B","#FFCA3A","#4CAF50"]
     fig = go.Figure(data=[go.Pie(labels=labels, values=values, hole=0.3, marker_colors=colors)])
     fig.update_layout(showlegend=True, margin=dict(t=0,b=0,l=0,r=0))
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+def log_failed_save(future):
+    # History writes run in the background; without this their errors vanish
+    if not future.cancelled() and future.exception() is not None:
+        log.error("Saving analysis to history failed", exc_info=future.exception())
 
 def timeline_step(title, status, description=""):
     colors = {"pass":"#28a745","warn":"#ffc107","fail":"#dc3545","pending":"#6c757d"}
@@ -107,41 +89,6 @@ def timeline_step(title, status, description=""):
         </div>
     """, unsafe_allow_html=True)
 
-# ------------------------------
-# SQLITE HISTORY FUNCTIONS
-# ------------------------------
-DB_PATH = "app_data.db"
-
-def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS history (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id TEXT NOT NULL,
-            url TEXT,
-            title TEXT NOT NULL,
-            verdict TEXT NOT NULL,
-            satire_prob REAL,
-            fake_prob REAL,
-            timestamp TEXT NOT NULL
-        )
-    """)
-    conn.commit()
-    conn.close()
-
-def save_to_history(user_id, url, title, verdict, satire_prob, fake_prob):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("""
-        INSERT INTO history (user_id, url, title, verdict, satire_prob, fake_prob, timestamp)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, (user_id, url, title, verdict, satire_prob, fake_prob, datetime.utcnow().isoformat()))
-    conn.commit()
-    conn.close()
-
-init_db()
-
 # ------------------------------
 # MAIN INPUT & SCRAPER STATUS
 # ------------------------------
@@ -158,78 +105,76 @@ with col2:
 # ------------------------------
 # ANALYZE BUTTON
 # ------------------------------
-if st.button("Analyze"):
-    article_title = title_input.strip()
-    article_text = text_input.strip()
-
-    # --- Scrape if URL provided ---
-    if url_input.strip():
-        domain = urlparse(url_input).netloc.replace("www.","")
-        scraper = SCRAPER_MAP.get(domain)
-
-        if not scraper:
-            scraper_status_placeholder.error("❌ Website not supported for scraping.")
-            st.stop()
-
-        try:
-            with st.spinner("🔍 Scraping article..."):
-                data = scraper(url_input)
-            article_title = data.get("title", article_title)
-            article_text = data.get("text", article_text)
-
-            scraper_status_placeholder.success(f"✅ Article detected!\n\n*{article_title}*")
-
-        except Exception as e:
-            scraper_status_placeholder.error(f"❌ Scraping failed: {e}")
-            st.stop()
+# A rerun while a scrape is still running (e.g. the user clicked Cancel or
+# Analyze again) cancels it: the scrape stops before parsing, or before
+# fetching if it has not started. A request already in flight runs to its
+# timeout in the background.
+pending_scrape = st.session_state.pop("scrape_future", None)
+cancel_scrape = st.session_state.pop("scrape_cancel", None)
+if pending_scrape is not None and not pending_scrape.done():
+    cancel_scrape.set()
+    pending_scrape.cancel()
+    scraper_status_placeholder.info("⏹️ Previous scrape cancelled.")
+
+# The last analysis is kept in session state keyed on the inputs: each
+# piece is recorded as it is drawn, so any other widget interaction redraws
+# it as-is without scraping, scoring or SQLite.
+inputs = (url_input.strip(), title_input.strip(), text_input.strip())
+memo = st.session_state.get("analysis")
+if memo is not None and memo["inputs"] != inputs:
+    memo = None
+
+def draw(kind, *args):
+    if kind == "status":
+        getattr(scraper_status_placeholder, args[0])(args[1])
+    elif kind == "step":
+        timeline_step(*args)
+    elif kind == "html":
+        st.markdown(args[0], unsafe_allow_html=True)
     else:
-        scraper_status_placeholder.info("ℹ️ No URL provided. Using manual input.")
-
-    if not article_title and not article_text:
-        st.warning("Please provide headline or article text.")
-        st.stop()
-
-    # ------------------------------
-    # ANALYSIS WORKFLOW
-    # ------------------------------
-    st.markdown("## 🧭 Analysis Timeline")
-    verdict = None
-    satire_warn = False
+        getattr(st, kind)(*args)
+
+def show(kind, *args):
+    """Draw one piece of the analysis and record it for later reruns."""
+    draw(kind, *args)
+    memo["pieces"].append((kind, args))
+    # Time to first verdict: the clock stops once the first verdict step is drawn
+    if kind == "step" and args[1] != "pending" and memo["elapsed"] is None:
+        memo["elapsed"] = time.perf_counter() - memo["started"]
+
+def show_satire(satire_prob, satire, satire_warn):
+    if satire:
+        show("step", "Satire Detection", "fail", f"High satire detected ({satire_prob:.2%})")
+    elif satire_warn:
+        show("step", "Satire Detection", "warn", f"Moderate satire ({satire_prob:.2%})")
+    else:
+        show("step", "Satire Detection", "pass", f"Low satire ({satire_prob:.2%})")
+
+def show_result(article, result, satire_shown=False):
+    """Timeline, verdict and notes for a scored article; returns False when there is no verdict."""
+    if result["source"] == "reputation":
+        show("step", "Source Reputation", "pending", f"Known source <b>{article['domain']}</b> — scored from history")
+    verdict = result["verdict"]
+    if verdict == "unsupported":
+        language_name = language.LANGUAGE_NAMES.get(result["language"], result["language"])
+        show("step", "Language Detection", "warn", f"Detected <b>{language_name}</b> — no model for this language yet")
+        show("warning", "⚠️ This article's language is not supported yet, so no verdict was produced.")
+        return False
+    satire_warn = result["satire_warn"]
+    satire_prob = result["satire_prob"]
+    final_fake_prob = result["fake_prob"]
 
     # -------- Satire Detection --------
-    satire_prob = predict_satire_prob(article_title, article_text)
-    if url_input.strip() and "theonion.com" in url_input:
-        satire_prob = min(1.0, satire_prob + 0.6)
-
-    if satire_prob >= SATIRE_HIGH:
-        timeline_step("Satire Detection", "fail", f"High satire detected ({satire_prob:.2%})")
-        verdict = "satire"
-    elif SATIRE_LOW <= satire_prob < SATIRE_HIGH:
-        timeline_step("Satire Detection", "warn", f"Moderate satire ({satire_prob:.2%})")
-        satire_warn = True
-    else:
-        timeline_step("Satire Detection", "pass", f"Low satire ({satire_prob:.2%})")
+    if not satire_shown:
+        show_satire(satire_prob, verdict == "satire", satire_warn)
 
     # -------- Credibility --------
-    fake_prob = predict_fake_prob(article_title, article_text)
-    final_fake_prob = fake_prob
-    if url_input.strip() and "theonion.com" in url_input:
-        final_fake_prob = max(0, fake_prob - 0.2)
-
-    if verdict is None:
-        if final_fake_prob >= FAKE_HIGH:
-            timeline_step("Credibility", "fail", f"High likelihood of misinformation ({final_fake_prob:.2%})")
-            verdict = "fake"
-        elif FAKE_UNCERTAIN <= final_fake_prob < FAKE_HIGH:
-            timeline_step("Credibility", "warn", f"Inconclusive result ({final_fake_prob:.2%})")
-            verdict = "unverified"
-        else:
-            timeline_step("Credibility", "pass", f"Likely credible ({1-final_fake_prob:.2%})")
-            verdict = "real"
-
-    # -------- Pie Chart Explainability --------
-    st.markdown("## 📊 Model Explainability")
-    plot_probability_pie(satire_prob, final_fake_prob)
+    if verdict == "fake":
+        show("step", "Credibility", "fail", f"High likelihood of misinformation ({final_fake_prob:.2%})")
+    elif verdict == "unverified":
+        show("step", "Credibility", "warn", f"Inconclusive result ({final_fake_prob:.2%})")
+    elif verdict == "real":
+        show("step", "Credibility", "pass", f"Likely credible ({1-final_fake_prob:.2%})")
 
     # -------- Final Verdict --------
     verdict_text = {
@@ -241,12 +186,101 @@ if st.button("Analyze"):
     verdict_colors = {
         "satire":"#FF6B6B","fake":"#DC3545","unverified":"#FFC107","real":"#4CAF50"
     }
-    st.markdown(f"<div style='padding:20px;border-radius:16px;background-color:{verdict_colors.get(verdict,'#EEE')};font-weight:bold;text-align:center;'>{verdict_text.get(verdict,'Unknown')}</div>", unsafe_allow_html=True)
+    show("html", f"<div style='padding:20px;border-radius:16px;background-color:{verdict_colors.get(verdict,'#EEE')};font-weight:bold;text-align:center;'>{verdict_text.get(verdict,'Unknown')}</div>")
 
     if satire_warn and verdict != "satire":
-        st.info("⚠️ Moderate satirical elements detected — content may include exaggeration or humor.")
+        show("info", "⚠️ Moderate satirical elements detected — content may include exaggeration or humor.")
+    return True
+
+fresh = False
+if st.button("Analyze") and memo is None:
+    started = time.perf_counter()
+
+    # --- Scrape if URL provided ---
+    if url_input.strip():
+        cancel = threading.Event()
+        future = background.submit(analysis.fetch_article, url_input, title_input, text_input, worker_pool, cancel)
+        st.session_state.scrape_future = future
+        st.session_state.scrape_cancel = cancel
+        st.button("Cancel")
+        while not future.done():
+            scraper_status_placeholder.info(f"🔍 Scraping article... {time.perf_counter() - started:.1f}s")
+            time.sleep(0.1)
+        st.session_state.pop("scrape_future", None)
+        st.session_state.pop("scrape_cancel", None)
+
+        try:
+            article = future.result()
+        except Exception as e:
+            scraper_status_placeholder.error(f"❌ Scraping failed: {e}")
+            st.stop()
+
+        if article["stale"]:
+            status = ("warning", f"⚠️ Site is not responding — using a recent copy.\n\n*{article['title']}*")
+        elif article["cached"]:
+            status = ("success", f"✅ Article already analyzed!\n\n*{article['title']}*")
+        elif article["quality"] is not None and article["quality"] < analysis.LOW_EXTRACTION_QUALITY:
+            status = (
+                "warning",
+                f"⚠️ Article detected, but the page was hard to extract (quality {article['quality']:.0%}); "
+                f"paste the article text for a more reliable verdict.\n\n*{article['title']}*",
+            )
+        else:
+            status = ("success", f"✅ Article detected!\n\n*{article['title']}*")
+    else:
+        article = analysis.fetch_article("", title_input, text_input)
+        status = ("info", "ℹ️ No URL provided. Using manual input.")
 
-    # -------- Save to history --------
-   
-    
-    add_history(st.session_state.user_id, url_input, article_title, verdict, satire_prob, final_fake_prob)
+    if not article["title"] and not article["text"]:
+        st.warning("Please provide headline or article text.")
+        st.stop()
+
+    memo = {"inputs": inputs, "pieces": [], "result": None, "started": started, "elapsed": None, "figure": None}
+    # The headline is on screen while the models run
+    show("status", *status)
+    if article["title"]:
+        show("subheader", article["title"])
+    show("markdown", "## 🧭 Analysis Timeline")
+
+    # Satire is drawn as soon as the satire model has run, before credibility is scored
+    satire_shown = False
+    for stage, payload in analysis.score_in_stages(models, article, domain_index, worker_pool):
+        if stage == "satire":
+            show_satire(payload["satire_prob"], payload["satire"], payload["satire_warn"])
+            satire_shown = True
+        else:
+            result = payload
+    has_verdict = show_result(article, result, satire_shown)
+    memo["result"] = result if has_verdict else None
+    st.session_state.analysis = memo
+    fresh = True
+elif memo is not None:
+    for kind, args in memo["pieces"]:
+        draw(kind, *args)
+
+if memo is not None:
+    if memo["result"] is None:
+        st.stop()
+
+    # -------- Time to first verdict --------
+    timings = st.session_state.setdefault("verdict_timings", [])
+    if fresh:
+        timings.append(memo["elapsed"])
+    st.caption(
+        f"⏱️ Verdict in {memo['elapsed'] * 1000:.0f} ms "
+        f"(median {sorted(timings)[len(timings) // 2] * 1000:.0f} ms over {len(timings)} analyses this session)"
+    )
+
+    # -------- Save to history (after the response is on screen) --------
+    if fresh:
+        # pages/history.py and pages/search.py wait for this write before querying
+        st.session_state.pending_save = background.submit(
+            analysis.save_result, st.session_state.user_id, article, result, domain_index
+        )
+        st.session_state.pending_save.add_done_callback(log_failed_save)
+
+    # -------- Pie Chart Explainability --------
+    st.markdown("## 📊 Model Explainability")
+    if memo["figure"] is None:
+        memo["figure"] = probability_pie(memo["result"])
+    st.plotly_chart(memo["figure"], use_container_width=True)
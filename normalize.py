@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Text normalization ahead of both vectorizers.
+
+Homoglyphs, zero-width characters and s-p-a-c-e-d out words change the
+TF-IDF tokens without changing what a reader sees, which is enough to
+flip a verdict. normalize_text() undoes them:
+
+- Unicode NFKC (fullwidth and mathematical letters, ligatures)
+- Cyrillic and Greek look-alikes mapped to Latin
+- zero-width and bidi-control characters removed
+- combining marks removed when stacked ("zalgo") or on ASCII characters
+  (strike-through); a single mark on an accented letter is a tone mark,
+  as in Yoruba "pẹ̀lú", and is kept
+- runs of four or more single letters joined with one separator
+  ("f a k e", "f.a.k.e") collapsed into words; shorter runs ("Plan A B C")
+  and capitals between periods ("U.S.A.F.") are left alone
+
+Each step is a C-level call on precompiled tables and patterns and is
+skipped when a cheap check shows it has nothing to do, so clean text costs
+tens of microseconds against milliseconds for a vectorizer transform.
+"""
+
+import re
+import unicodedata
+
+# Latin look-alikes from Cyrillic and Greek, plus dotless i and script a/g.
+# Keys must be NFKC-stable (lunate sigma becomes final sigma first).
+CONFUSABLES = {
+    "а": "a", "е": "e", "о": "o", "р": "p", "с": "c", "у": "y", "х": "x",
+    "і": "i", "ј": "j", "ѕ": "s", "ԁ": "d", "ԛ": "q", "ԝ": "w", "ӏ": "l", "һ": "h",
+    "А": "A", "В": "B", "Е": "E", "К": "K", "М": "M", "Н": "H", "О": "O",
+    "Р": "P", "С": "C", "Т": "T", "Х": "X", "У": "Y", "І": "I", "Ј": "J", "Ѕ": "S",
+    "α": "a", "ο": "o", "ρ": "p", "ν": "v", "τ": "t", "ι": "i", "κ": "k", "ς": "c",
+    "Α": "A", "Β": "B", "Ε": "E", "Ζ": "Z", "Η": "H", "Ι": "I", "Κ": "K",
+    "Μ": "M", "Ν": "N", "Ο": "O", "Ρ": "P", "Τ": "T", "Χ": "X", "Υ": "Y",
+    "ı": "i", "ɑ": "a", "ɡ": "g",
+}
+
+# Zero-width, soft hyphen, bidi controls and other invisible format characters
+INVISIBLE_RANGES = (
+    (0x00AD, 0x00AD), (0x034F, 0x034F), (0x061C, 0x061C), (0x115F, 0x1160),
+    (0x17B4, 0x17B5), (0x180E, 0x180E), (0x200B, 0x200F), (0x202A, 0x202E),
+    (0x2060, 0x206F), (0xFE00, 0xFE0F), (0xFEFF, 0xFEFF),
+)
+# Combining marks left over after NFKC composition
+COMBINING_RANGES = ((0x0300, 0x036F), (0x1AB0, 0x1AFF), (0x1DC0, 0x1DFF), (0x20D0, 0x20FF), (0xFE20, 0xFE2F))
+
+
+def _char_class(ranges):
+    return "".join(f"\\U{start:08x}-\\U{end:08x}" for start, end in ranges)
+
+
+# One str.translate() maps confusables and deletes invisibles; the regex
+# only tells whether there is anything to translate
+_UNUSUAL = re.compile("[" + "".join(CONFUSABLES) + _char_class(INVISIBLE_RANGES) + "]")
+_TRANSLATION = str.maketrans({
+    **{chr(code): None for start, end in INVISIBLE_RANGES for code in range(start, end + 1)},
+    **CONFUSABLES,
+})
+_COMBINING = re.compile("[" + _char_class(COMBINING_RANGES) + "]+")
+
+# Four or more single letters joined by the same one-char separator
+_SPACED = re.compile(r"(?<!\w)[^\W\d_]([ .\-_*])[^\W\d_](?:\1[^\W\d_]){2,}(?!\w)")
+
+# Byte skeleton for a cheap pre-check: ASCII letters become "a" and
+# everything else a space, so a spaced-out word shows up as the substring
+# b" a a a a", found with one C-level "in".
+_SKELETON = bytes(ord("a") if chr(byte).isalpha() and byte < 128 else ord(" ") for byte in range(256))
+_SPACED_HINT = b" a a a a"
+
+
+def _strip_marks(match):
+    # Keep a lone mark on a non-ASCII letter: NFKC leaves Yoruba tone marks
+    # on under-dotted vowels (ẹ̀, ọ̀) uncomposed
+    start = match.start()
+    base = match.string[start - 1] if start else ""
+    if match.end() - start == 1 and base.isalpha() and not base.isascii():
+        return match.group(0)
+    return ""
+
+
+def _join_spaced(match):
+    # Letters sit at the even offsets of the match
+    letters = match.group(0)[::2]
+    if match.group(1) == "." and letters.isupper():
+        # An abbreviation, not an obfuscated word
+        return match.group(0)
+    return letters
+
+
+def normalize_text(text):
+    """Return text with homoglyphs, invisible characters and spaced-out words undone."""
+    if not text.isascii():
+        if not unicodedata.is_normalized("NFKC", text):
+            text = unicodedata.normalize("NFKC", text)
+        if _UNUSUAL.search(text):
+            text = text.translate(_TRANSLATION)
+        if _COMBINING.search(text):
+            text = _COMBINING.sub(_strip_marks, text)
+    if _SPACED_HINT in b" " + text.encode("utf-8", "ignore").translate(_SKELETON):
+        text = _SPACED.sub(_join_spaced, text)
+    return text
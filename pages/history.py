@@ -1,6 +1,7 @@
 import streamlit as st
 import sqlite3
-from datetime import datetime
+from concurrent.futures import wait
+from db import get_article_text, get_history_version
 
 # ------------------------------
 # LOCK PAGE UNTIL LOGIN
@@ -23,11 +24,15 @@ if "user_id" not in st.session_state or st.session_state.user_id is None:
 
 DB_PATH = "app_data.db"
 
-def get_user_history(user_id):
+# Queries are cached per (user, history version). The version is the
+# user's newest history id (db.get_history_version), so a rerun costs one
+# indexed lookup and any new row, from this session or elsewhere, is seen.
+@st.cache_data(max_entries=256, show_spinner=False)
+def get_user_history(user_id, version=0):
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
     c.execute("""
-        SELECT title, url, verdict, satire_prob, fake_prob, timestamp 
+        SELECT id, title, url, verdict, satire_prob, fake_prob, timestamp, body_hash IS NOT NULL 
         FROM history 
         WHERE user_id = ? 
         ORDER BY id DESC
@@ -36,19 +41,34 @@ def get_user_history(user_id):
     conn.close()
     return rows
 
+@st.cache_data(max_entries=256, show_spinner=False)
+def load_article_text(history_id):
+    # Stored text never changes, so it is cached for good
+    return get_article_text(history_id)
+
 st.title("🕘 Your Analysis History")
-history = get_user_history(st.session_state.user_id)
+pending_save = st.session_state.get("pending_save")
+if pending_save is not None:
+    # Let the analysis saved from main.py land before querying
+    wait([pending_save], timeout=5)
+history = get_user_history(st.session_state.user_id, get_history_version(st.session_state.user_id))
 
 if not history:
     st.info("You haven’t analyzed any articles yet.")
 else:
     for i, entry in enumerate(history, 1):
-        title, url, verdict, satire_prob, fake_prob, timestamp = entry
-        st.markdown(f"**{i}. {title}**")
-        st.markdown(f"- URL: {url or 'N/A'}")
-        st.markdown(f"- Verdict: {verdict.capitalize()}")
-        st.markdown(f"- Satire Probability: {satire_prob:.0%}")
-        st.markdown(f"- Fake Probability: {fake_prob:.0%}")
-        st.markdown(f"- Analyzed at: {timestamp}")
+        history_id, title, url, verdict, satire_prob, fake_prob, timestamp, has_text = entry
+        # One markdown element per entry: each element costs a round trip on rerun
+        st.markdown(
+            f"**{i}. {title}**\n"
+            f"- URL: {url or 'N/A'}\n"
+            f"- Verdict: {verdict.capitalize()}\n"
+            f"- Satire Probability: {satire_prob:.0%}\n"
+            f"- Fake Probability: {fake_prob:.0%}\n"
+            f"- Analyzed at: {timestamp}"
+        )
+        # Article text is decompressed only when the row is opened
+        if has_text and st.toggle("Show article text", key=f"text_{history_id}"):
+            st.text(load_article_text(history_id))
         st.markdown("---")
 
@@ -0,0 +1,38 @@
+import streamlit as st
+from concurrent.futures import wait
+from db import get_history_version, search_history
+
+# ------------------------------
+# LOCK PAGE UNTIL LOGIN
+# ------------------------------
+if "user_id" not in st.session_state or st.session_state.user_id is None:
+    st.warning("⚠️ Please log in first! Go to the Login page.")
+    st.stop()
+
+st.title("🔎 Search Your Analyses")
+query = st.text_input("Search headlines and article text", placeholder="e.g. budget senate")
+
+# Cached per (query, user, history version); see pages/history.py
+@st.cache_data(max_entries=256, show_spinner=False)
+def cached_search(query, user_id, version=0):
+    return search_history(query, user_id, limit=50)
+
+if query.strip():
+    pending_save = st.session_state.get("pending_save")
+    if pending_save is not None:
+        wait([pending_save], timeout=5)
+    user_id = st.session_state.user_id
+    results = cached_search(query.strip(), user_id, get_history_version(user_id))
+    if not results:
+        st.info("No matching articles found.")
+    for i, entry in enumerate(results, 1):
+        _, url, title, verdict, satire_prob, fake_prob, timestamp, _ = entry
+        st.markdown(
+            f"**{i}. {title}**\n"
+            f"- URL: {url or 'N/A'}\n"
+            f"- Verdict: {verdict.capitalize()}\n"
+            f"- Satire Probability: {satire_prob:.0%}\n"
+            f"- Fake Probability: {fake_prob:.0%}\n"
+            f"- Analyzed at: {timestamp}"
+        )
+        st.markdown("---")
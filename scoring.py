@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+"""
+Scoring and probability fusion shared by the interactive page and the
+batch paths (crawler, API, workers).
+
+The satire and credibility models are scored independently; fuse() turns
+their raw probabilities into calibrated marginals, applies per-domain
+log-odds adjustments from a lookup table and returns a joint
+satire / fake / credible distribution that always sums to one.
+
+Calibration is fitted from labelled articles and saved next to the models:
+    python scoring.py calibrate labels.csv [--models-dir models/pcm]
+"""
+
+import argparse
+import csv
+import json
+import os
+
+import joblib
+import numpy as np
+
+from normalize import normalize_text
+
+MODEL_FILES = ("model.pkl", "vectorizer.pkl", "Satire_model.pkl", "Satire_vectorizer.pkl")
+# Fitted Platt parameters, written next to the model files by "python scoring.py calibrate"
+CALIBRATION_FILE = "calibration.json"
+
+SATIRE_HIGH = 0.70
+SATIRE_LOW = 0.40
+FAKE_HIGH = 0.75
+FAKE_UNCERTAIN = 0.55
+
+# Platt scaling parameters (a, b): calibrated = sigmoid(a * logit(p) + b).
+# (1.0, 0.0) is the identity, used until load_models() finds a CALIBRATION_FILE.
+IDENTITY_CALIBRATION = {
+    "satire": (1.0, 0.0),
+    "fake": (1.0, 0.0),
+}
+CALIBRATION = dict(IDENTITY_CALIBRATION)
+
+# Per-domain log-odds shifts (satire_shift, fake_shift).
+# theonion.com reproduces the old "+0.6 satire / -0.2 fake" boost around the
+# decision thresholds without ever leaving [0, 1].
+DOMAIN_ADJUSTMENTS = {
+    "theonion.com": (3.0, -1.0),
+}
+
+_EPS = 1e-6
+
+
+# ------------------------------
+# MODELS
+# ------------------------------
+def load_models(directory=""):
+    """
+    Load (model, vectorizer, satire_model, satire_vectorizer) from disk.
+
+    Loading the default models also installs their fitted calibration as
+    CALIBRATION, so every process that scores (page, API, workers,
+    crawler) uses the same parameters.
+    """
+    models = tuple(joblib.load(os.path.join(directory, path)) for path in MODEL_FILES)
+    if not directory:
+        CALIBRATION.update(load_calibration())
+    return models
+
+
+def _join(titles, texts):
+    # Normalized once here so both vectorizers see the same cleaned text
+    return [normalize_text(f"{title}. {text}") for title, text in zip(titles, texts)]
+
+
+def _satire_probs(satire_model, satire_vectorizer, docs):
+    X = satire_vectorizer.transform(docs)
+    if hasattr(satire_model, "predict_proba"):
+        return satire_model.predict_proba(X)[:, 1]
+    return _sigmoid(satire_model.decision_function(X))
+
+
+def _fake_probs(model, vectorizer, docs):
+    X = vectorizer.transform(docs)
+    return model.predict_proba(X)[:, 1]
+
+
+def predict_satire_probs(satire_model, satire_vectorizer, titles, texts):
+    return _satire_probs(satire_model, satire_vectorizer, _join(titles, texts))
+
+
+def predict_fake_probs(model, vectorizer, titles, texts):
+    return _fake_probs(model, vectorizer, _join(titles, texts))
+
+
+# ------------------------------
+# CALIBRATION
+# ------------------------------
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _logit(p):
+    p = np.clip(np.asarray(p, dtype=float), _EPS, 1 - _EPS)
+    return np.log(p / (1 - p))
+
+
+def fit_platt(probs, labels, iterations=100):
+    """
+    Fit Platt scaling parameters (a, b) for raw model probabilities.
+
+    Args:
+        probs: raw positive-class probabilities
+        labels: 0/1 ground truth
+
+    Returns:
+        Tuple[float, float]: (a, b) for use in CALIBRATION
+    """
+    x = _logit(probs)
+    y = np.asarray(labels, dtype=float)
+    a, b = 1.0, 0.0
+    for _ in range(iterations):
+        p = _sigmoid(a * x + b)
+        w = p * (1 - p) + _EPS
+        grad = np.array([np.dot(p - y, x), np.sum(p - y)])
+        hess = np.array([
+            [np.dot(w, x * x), np.dot(w, x)],
+            [np.dot(w, x), np.sum(w)],
+        ])
+        step = np.linalg.solve(hess + _EPS * np.eye(2), grad)
+        a, b = a - step[0], b - step[1]
+        if np.abs(step).max() < 1e-8:
+            break
+    return float(a), float(b)
+
+
+def load_calibration(directory=""):
+    """Platt parameters from directory's CALIBRATION_FILE, or the identity when there is none."""
+    path = os.path.join(directory, CALIBRATION_FILE)
+    calibration = dict(IDENTITY_CALIBRATION)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            calibration.update({name: tuple(params) for name, params in json.load(f).items()})
+    return calibration
+
+
+def save_calibration(calibration, directory=""):
+    with open(os.path.join(directory, CALIBRATION_FILE), "w", encoding="utf-8") as f:
+        json.dump({name: list(params) for name, params in calibration.items()}, f, indent=2)
+
+
+def fit_calibration(models, titles, texts, labels):
+    """
+    Fit Platt parameters for both models from labelled articles.
+
+    Args:
+        labels: "satire", "fake" or "real" per article
+
+    Returns:
+        Dict: {"satire": (a, b), "fake": (a, b)} for save_calibration()
+    """
+    model, vectorizer, satire_model, satire_vectorizer = models
+    docs = _join(titles, texts)
+    labels = np.asarray(labels)
+    satire_raw = _satire_probs(satire_model, satire_vectorizer, docs)
+    fake_raw = _fake_probs(model, vectorizer, docs)
+    # The fake marginal is conditional on not being satire (see joint()),
+    # so it is fitted on the non-satire articles only
+    not_satire = labels != "satire"
+    return {
+        "satire": fit_platt(satire_raw, labels == "satire"),
+        "fake": fit_platt(fake_raw[not_satire], labels[not_satire] == "fake"),
+    }
+
+
+# ------------------------------
+# FUSION
+# ------------------------------
+def domain_shifts(domains, adjustments=None):
+    """Look up (satire_shift, fake_shift) arrays for a batch of domains."""
+    table = DOMAIN_ADJUSTMENTS if adjustments is None else adjustments
+    shifts = np.array([table.get(d, (0.0, 0.0)) for d in domains], dtype=float)
+    return shifts.reshape(-1, 2)
+
+
+def combine_adjustments(base, extra):
+    """Return a copy of the adjustments table base with extra's shifts added per domain."""
+    table = dict(base)
+    for domain, (satire_shift, fake_shift) in extra.items():
+        base_satire, base_fake = table.get(domain, (0.0, 0.0))
+        table[domain] = (base_satire + satire_shift, base_fake + fake_shift)
+    return table
+
+
+def fuse(satire_probs, fake_probs, domains=None, adjustments=None, calibration=None):
+    """
+    Fuse raw satire and fake probabilities for a batch of articles.
+
+    Args:
+        satire_probs, fake_probs: raw model probabilities, one per article
+        domains: normalized netlocs ("" or None for manual input)
+        adjustments: per-domain log-odds table, defaults to DOMAIN_ADJUSTMENTS
+        calibration: Platt parameters, defaults to CALIBRATION
+
+    Returns:
+        Dict[str, np.ndarray]: calibrated marginals "satire" and "fake" plus the
+        joint three-class distribution "p_satire", "p_fake", "p_credible"
+    """
+    calibration = CALIBRATION if calibration is None else calibration
+    shifts = np.zeros((len(satire_probs), 2))
+    if domains is not None:
+        shifts = domain_shifts([d or "" for d in domains], adjustments)
+    return joint(
+        _calibrated(satire_probs, calibration["satire"], shifts[:, 0]),
+        _calibrated(fake_probs, calibration["fake"], shifts[:, 1]),
+    )
+
+
+def _calibrated(probs, params, shifts):
+    a, b = params
+    return _sigmoid(a * _logit(probs) + b + shifts)
+
+
+def joint(satire, fake):
+    """Build the three-class distribution from satire and fake marginals."""
+    satire = np.asarray(satire, dtype=float)
+    fake = np.asarray(fake, dtype=float)
+    # Satire is decided first; fake vs credible splits what remains.
+    return {
+        "satire": satire,
+        "fake": fake,
+        "p_satire": satire,
+        "p_fake": (1 - satire) * fake,
+        "p_credible": (1 - satire) * (1 - fake),
+    }
+
+
+def classify(satire, fake):
+    """
+    Map calibrated marginals to verdicts.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (verdicts, satire_warn flags)
+    """
+    satire = np.asarray(satire, dtype=float)
+    fake = np.asarray(fake, dtype=float)
+    verdicts = np.select(
+        [satire >= SATIRE_HIGH, fake >= FAKE_HIGH, fake >= FAKE_UNCERTAIN],
+        ["satire", "fake", "unverified"],
+        default="real",
+    )
+    satire_warn = (satire >= SATIRE_LOW) & (satire < SATIRE_HIGH)
+    return verdicts, satire_warn
+
+
+def satire_stage(models, titles, texts, domains=None, adjustments=None, calibration=None):
+    """
+    Run only the satire model, the first half of score_batch().
+
+    Returns:
+        Tuple[np.ndarray, List[Dict]]: the raw satire probabilities (pass
+        them on as score_batch(satire_raw=...)) and per article the
+        calibrated "satire_prob", "satire_warn" and "satire" (at or above
+        SATIRE_HIGH, which makes the verdict satire whatever the fake model says)
+    """
+    _, _, satire_model, satire_vectorizer = models
+    satire_raw = _satire_probs(satire_model, satire_vectorizer, _join(titles, texts))
+    calibration = CALIBRATION if calibration is None else calibration
+    shifts = np.zeros(len(satire_raw))
+    if domains is not None:
+        shifts = domain_shifts([d or "" for d in domains], adjustments)[:, 0]
+    satire = _calibrated(satire_raw, calibration["satire"], shifts)
+    verdicts, satire_warn = classify(satire, np.zeros_like(satire))
+    return satire_raw, [
+        {"satire_prob": float(p), "satire_warn": bool(warn), "satire": verdict == "satire"}
+        for p, warn, verdict in zip(satire, satire_warn, verdicts)
+    ]
+
+
+def score_batch(models, titles, texts, domains=None, adjustments=None, calibration=None, satire_raw=None):
+    """
+    Score a batch of articles end to end.
+
+    Args:
+        models: tuple returned by load_models()
+        titles, texts: article headlines and bodies
+        domains: normalized netlocs, or None for manual input
+        calibration: Platt parameters for these models, defaults to CALIBRATION
+        satire_raw: raw satire probabilities from satire_stage(), so the
+            satire model is not run again
+
+    Returns:
+        List[Dict]: one result per article with verdict, satire_warn,
+        calibrated satire_prob / fake_prob and the joint distribution
+    """
+    model, vectorizer, satire_model, satire_vectorizer = models
+    if not titles:
+        return []
+    docs = _join(titles, texts)
+    if satire_raw is None:
+        satire_raw = _satire_probs(satire_model, satire_vectorizer, docs)
+    fake_raw = _fake_probs(model, vectorizer, docs)
+    return build_results(fuse(satire_raw, fake_raw, domains, adjustments, calibration))
+
+
+def unshifted_verdicts(results, domains, adjustments):
+    """
+    Verdicts for scored results with the given per-domain shifts taken back out.
+
+    The domain index counts these rather than the verdicts its own shifts
+    moved, so its priors are not fed back into themselves.
+    """
+    shifts = domain_shifts([d or "" for d in domains], adjustments)
+    satire = _sigmoid(_logit([r["satire_prob"] for r in results]) - shifts[:, 0])
+    fake = _sigmoid(_logit([r["fake_prob"] for r in results]) - shifts[:, 1])
+    return [str(verdict) for verdict in classify(satire, fake)[0]]
+
+
+def build_results(fused):
+    """Turn a fused batch (see fuse() / joint()) into per-article result dicts."""
+    verdicts, satire_warn = classify(fused["satire"], fused["fake"])
+
+    return [
+        {
+            "verdict": str(verdicts[i]),
+            "satire_warn": bool(satire_warn[i]),
+            "satire_prob": float(fused["satire"][i]),
+            "fake_prob": float(fused["fake"][i]),
+            "p_satire": float(fused["p_satire"][i]),
+            "p_fake": float(fused["p_fake"][i]),
+            "p_credible": float(fused["p_credible"][i]),
+        }
+        for i in range(len(verdicts))
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit the Platt calibration for a model directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+    calibrate = sub.add_parser("calibrate", help=f"fit from labelled articles and write {CALIBRATION_FILE}")
+    calibrate.add_argument("labels", help="CSV with title, text and label (satire / fake / real) columns")
+    calibrate.add_argument("--models-dir", default="", help="model directory, e.g. models/pcm (default: .)")
+    args = parser.parse_args()
+
+    with open(args.labels, encoding="utf-8", newline="") as f:
+        rows = [row for row in csv.DictReader(f) if row.get("label") in ("satire", "fake", "real")]
+    if not rows:
+        parser.error("no rows labelled satire, fake or real")
+    models = load_models(args.models_dir)
+    calibration = fit_calibration(
+        models, [row["title"] for row in rows], [row.get("text") or "" for row in rows], [row["label"] for row in rows]
+    )
+    save_calibration(calibration, args.models_dir)
+    print(f"Fitted on {len(rows)} articles: " + ", ".join(f"{name} a={a:.3f} b={b:.3f}" for name, (a, b) in calibration.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+Per-site article parsers keyed by normalized netloc.
+
+Pages are fetched by scrapers.fetch.fetch_page (through scrapers.dispatch
+for rate limits and breakers) and parsed here, possibly in another process
+(see workers.py). Domains without a dedicated parser use the generic
+extractor.
+"""
+
+from scrapers.bbc import parse_bbc_article
+from scrapers.pulse_ng import parse_pulse_article
+from scrapers.punch import parse_punch_article
+from scrapers.instablog import parse_instablog_article
+from scrapers.onion import parse_onion_article
+from scrapers.fox import parse_fox_article
+from scrapers.aljazeera import parse_aljazeera_article
+from scrapers.arise import parse_arise_tv_article
+from scrapers.channels import parse_channelstv_article
+from scrapers.sahara import parse_saharareporters_article
+from scrapers.generic import parse_generic_article
+
+PARSER_MAP = {
+    "bbc.com": parse_bbc_article,
+    "www.pulse.ng": parse_pulse_article,
+    "pulse.ng": parse_pulse_article,
+    "punchng.com": parse_punch_article,
+    "instablog9ja.com": parse_instablog_article,
+    "theonion.com": parse_onion_article,
+    "foxnews.com": parse_fox_article,
+    "arise.tv": parse_arise_tv_article,
+    "saharareporters.com": parse_saharareporters_article,
+    "channelstv.com": parse_channelstv_article,
+    "aljazeera.com": parse_aljazeera_article
+}
+
+
+def parse_html(domain, html, url):
+    """Parse fetched HTML with the dedicated parser for domain, or the generic one."""
+    parser = PARSER_MAP.get(domain)
+    if parser is None:
+        return parse_generic_article(html, url)
+    return parser(html)
@@ -5,40 +5,24 @@ Created on Mon Jan 26 09:07:09 2026
 @author: Oreoluwa
 """
 
-import requests
 from bs4 import BeautifulSoup
+from scrapers.boilerplate import clean_paragraphs
 from typing import Dict
 
-def scrape_arise_tv_article(url: str) -> Dict[str, str]:
+def parse_arise_tv_article(html: str) -> Dict[str, str]:
     """
-    Scrapes an Arise.tv news article and returns the title and main text.
+    Parses the HTML of an Arise.tv news article and returns the title and main text.
 
     Args:
-        url (str): URL of the Arise.tv article
+        html (str): page HTML of the Arise.tv article
 
     Returns:
         Dict[str, str]: {"title": ..., "text": ...}
 
     Raises:
         ValueError: If expected content isn’t found
-        requests.RequestException: If HTTP request fails
     """
-
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/120.0 Safari/537.36"
-        )
-    }
-
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-    except requests.RequestException as e:
-        raise requests.RequestException(f"Failed to fetch page: {e}")
-
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = BeautifulSoup(html, "html.parser")
 
     # ---- Extract title ----
     title_tag = soup.find("h1")
@@ -60,8 +44,8 @@ def scrape_arise_tv_article(url: str) -> Dict[str, str]:
     if not paragraphs:
         raise ValueError("No article paragraphs found")
 
-    article_text = "\n\n".join(p.get_text(strip=True) for p in paragraphs)
+    article_text, quality = clean_paragraphs(paragraphs, article_container)
 
-    return {"title": title, "text": article_text}
+    return {"title": title, "text": article_text, "quality": quality}
 
 
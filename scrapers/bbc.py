@@ -1,38 +1,22 @@
-import requests
 from bs4 import BeautifulSoup
+from scrapers.boilerplate import clean_paragraphs
 from typing import Tuple
 
 
-def scrape_bbc_article(url: str) -> Tuple[str, str]:
+def parse_bbc_article(html: str) -> Tuple[str, str]:
     """
-    Scrapes a BBC News article and returns the title and main text.
+    Parses the HTML of a BBC News article and returns the title and main text.
 
     Args:
-        url (str): URL of the BBC News article
+        html (str): page HTML of the BBC News article
 
     Returns:
         Tuple[str, str]: (title, article_text)
 
     Raises:
         ValueError: If expected article structure isn't found
-        requests.RequestException: If the HTTP request fails
     """
-
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/120.0 Safari/537.36"
-        )
-    }
-
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-    except requests.RequestException as e:
-        raise requests.RequestException(f"Failed to fetch page: {e}")
-
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = BeautifulSoup(html, "html.parser")
 
     # ---- Extract title ----
     title_tag = soup.find("h1")
@@ -55,9 +39,10 @@ def scrape_bbc_article(url: str) -> Tuple[str, str]:
     if not paragraphs:
         raise ValueError("No article paragraphs found")
 
-    article_text = "\n\n".join(p.get_text(strip=True) for p in paragraphs)
+    article_text, quality = clean_paragraphs(paragraphs, article_body)
 
     return {
             "title": title,
             "text": article_text,
+            "quality": quality,
         }
@@ -0,0 +1,98 @@
+"""
+Boilerplate removal applied to the paragraphs every scraper extracts.
+
+Drops navigation, cookie banners, share prompts and related-link lists
+using link density, text density and container hints, and reports an
+extraction-quality score for the text that is kept.
+"""
+
+import re
+from typing import Iterable, Optional, Tuple
+
+from bs4 import Tag
+
+BOILERPLATE_CONTAINERS = {"nav", "header", "footer", "aside", "form", "figcaption", "noscript"}
+
+BOILERPLATE_HINTS = re.compile(
+    r"cookie|consent|subscribe|newsletter|related|recommend|share|social|promo|"
+    r"advert|sponsor|footer|navbar|menu|breadcrumb|comment|sidebar|widget|byline|caption",
+    re.I,
+)
+
+BOILERPLATE_PHRASES = re.compile(
+    r"we use cookies|accept (all )?cookies|all rights reserved|sign up for|subscribe to|"
+    r"follow us on|read more:|click here|download our app|join our whatsapp|"
+    r"copyright ©|© \d{4}",
+    re.I,
+)
+
+MAX_LINK_DENSITY = 0.5
+MIN_WORDS = 6
+# Kept text at or above this many characters counts as a full-length article
+FULL_ARTICLE_CHARS = 1500
+
+
+def _in_boilerplate_container(tag: Tag, container: Optional[Tag]) -> bool:
+    for parent in tag.parents:
+        if parent is container:
+            break
+        if parent.name in BOILERPLATE_CONTAINERS:
+            return True
+        attrs = " ".join(parent.get("class") or []) + " " + (parent.get("id") or "")
+        if attrs.strip() and BOILERPLATE_HINTS.search(attrs):
+            return True
+        if parent.name in ("article", "body"):
+            break
+    return False
+
+
+def _link_density(tag: Tag, text_length: int) -> float:
+    link_chars = sum(len(a.get_text(strip=True)) for a in tag.find_all("a"))
+    return link_chars / max(text_length, 1)
+
+
+def is_boilerplate(tag: Tag, text: str, container: Optional[Tag] = None) -> bool:
+    """Return True if a paragraph looks like page chrome rather than article body."""
+    if _link_density(tag, len(text)) > MAX_LINK_DENSITY:
+        return True
+    if BOILERPLATE_PHRASES.search(text):
+        return True
+    # Short fragments without sentence punctuation are labels, not prose
+    if len(text.split()) < MIN_WORDS and not text.rstrip().endswith((".", "!", "?", '"', "”")):
+        return True
+    return _in_boilerplate_container(tag, container)
+
+
+def clean_paragraphs(paragraphs: Iterable[Tag], container: Optional[Tag] = None) -> Tuple[str, float]:
+    """
+    Join the article-body paragraphs, dropping boilerplate.
+
+    Args:
+        paragraphs: <p> tags found by a scraper
+        container: the article container the scraper selected; ancestors
+            above it are not checked for boilerplate hints
+
+    Returns:
+        Tuple[str, float]: ("\\n\\n"-joined text, quality score in [0, 1]).
+        Quality combines the share of extracted text kept with how close
+        the kept text is to a full-length article. If every paragraph
+        looks like boilerplate, all of them are kept and quality is 0.
+    """
+    kept, dropped_chars, all_texts = [], 0, []
+    for p in paragraphs:
+        text = p.get_text(strip=True)
+        if not text:
+            continue
+        all_texts.append(text)
+        if is_boilerplate(p, text, container):
+            dropped_chars += len(text)
+        else:
+            kept.append(text)
+
+    if not kept:
+        return "\n\n".join(all_texts), 0.0
+
+    kept_chars = sum(len(t) for t in kept)
+    kept_share = kept_chars / (kept_chars + dropped_chars)
+    length_score = min(1.0, kept_chars / FULL_ARTICLE_CHARS)
+    return "\n\n".join(kept), round(0.5 * kept_share + 0.5 * length_score, 3)
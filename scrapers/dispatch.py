@@ -0,0 +1,273 @@
+"""
+Per-domain rate limiting, circuit breaking and adaptive timeouts around the scrapers.
+
+Every fetch for a domain first takes a token from that domain's bucket,
+then goes through its circuit breaker: after repeated network failures the
+breaker opens and requests fail fast (or get the last good copy of the
+article) until a cooldown passes and a single probe succeeds. Timeouts
+follow each domain's recent latency instead of a flat 10 seconds.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict
+
+import requests
+
+from scrapers import parse_html
+from scrapers.fetch import UnsafeURL, fetch_page
+from urls import normalize_netloc, resolve_canonical
+
+RATE = 2.0              # tokens per second, per domain
+BURST = 5               # bucket size
+MAX_WAIT = 3.0          # longest a request waits for a token before failing
+
+FAILURE_THRESHOLD = 5   # consecutive failures that open the breaker
+COOLDOWN = 30.0         # seconds the breaker stays open before a probe
+
+MIN_TIMEOUT = 2.0
+MAX_TIMEOUT = 10.0
+LATENCY_WINDOW = 50
+MIN_SAMPLES = 10
+
+CACHE_SIZE = 512
+
+
+class DomainUnavailable(requests.RequestException):
+    """Raised when a domain is rate limited or its circuit breaker is open."""
+
+
+class ScrapeCancelled(Exception):
+    """Raised when the caller's cancel event is set before the page is parsed."""
+
+
+def _is_domain_failure(error):
+    """Timeouts, connection errors, 5xx and blocking (403/429) count against a domain; other 4xx do not."""
+    if isinstance(error, UnsafeURL):
+        return False
+    response = error.response
+    if response is None:
+        return True
+    return response.status_code >= 500 or response.status_code in (403, 429)
+
+
+class TokenBucket:
+    def __init__(self, rate=RATE, burst=BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def reserve(self):
+        """Take a token, returning how long the caller must wait for it."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self):
+        self.tokens = min(self.burst, self.tokens + 1)
+
+
+class DomainState:
+    """Bucket, breaker and latency window for one domain."""
+
+    def __init__(self, rate=RATE, burst=BURST):
+        self.lock = threading.Lock()
+        self.bucket = TokenBucket(rate, burst)
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def timeout(self):
+        if len(self.latencies) < MIN_SAMPLES:
+            return MAX_TIMEOUT
+        ordered = sorted(self.latencies)
+        p95 = ordered[int(0.95 * (len(ordered) - 1))]
+        return min(MAX_TIMEOUT, max(MIN_TIMEOUT, 2 * p95))
+
+
+class ScrapeDispatcher:
+    """
+    Dispatch scrapes through per-domain limits and breakers.
+
+    One instance is shared per process (see DISPATCHER) so all callers see
+    the same domain state.
+
+    Args:
+        rate (float): requests per second allowed per domain
+        burst (int): requests per domain allowed at once after a quiet spell
+    """
+
+    def __init__(self, rate=RATE, burst=BURST):
+        self.rate = rate
+        self.burst = burst
+        self._states = {}
+        self._states_lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def _state(self, domain):
+        with self._states_lock:
+            if domain not in self._states:
+                self._states[domain] = DomainState(self.rate, self.burst)
+            return self._states[domain]
+
+    # ------------------------------
+    # LAST-GOOD CACHE
+    # ------------------------------
+    def _remember(self, url, data):
+        with self._cache_lock:
+            self._cache[url] = data
+            self._cache.move_to_end(url)
+            while len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    def _cached(self, url):
+        with self._cache_lock:
+            data = self._cache.get(url)
+        return {**data, "stale": True} if data else None
+
+    # ------------------------------
+    # BREAKER
+    # ------------------------------
+    def _admit(self, domain, state):
+        """Check the breaker and take a rate-limit token; returns the timeout to use."""
+        with state.lock:
+            if state.opened_at is not None:
+                if time.monotonic() - state.opened_at < COOLDOWN or state.probing:
+                    raise DomainUnavailable(f"{domain} is failing; retry in a little while")
+                # Half-open: let exactly one probe through
+                state.probing = True
+            wait = state.bucket.reserve()
+            if wait > MAX_WAIT:
+                state.bucket.refund()
+                state.probing = False
+                raise DomainUnavailable(f"Too many requests to {domain}; retry in {wait:.0f}s")
+            timeout = state.timeout()
+        if wait:
+            time.sleep(wait)
+        return timeout
+
+    def _record(self, state, latency=None):
+        with state.lock:
+            state.probing = False
+            if latency is None:
+                state.failures += 1
+                if state.failures >= FAILURE_THRESHOLD or state.opened_at is not None:
+                    state.opened_at = time.monotonic()
+            else:
+                state.failures = 0
+                state.opened_at = None
+                state.latencies.append(latency)
+
+    def _release(self, state):
+        """End an admitted request without counting it for or against the domain."""
+        with state.lock:
+            state.probing = False
+
+    def status(self, domain) -> Dict:
+        """Snapshot of a domain's breaker, bucket and timeout, for diagnostics."""
+        state = self._state(domain)
+        with state.lock:
+            return {
+                "open": state.opened_at is not None,
+                "failures": state.failures,
+                "tokens": round(state.bucket.tokens, 2),
+                "timeout": state.timeout(),
+                "samples": len(state.latencies),
+            }
+
+    # ------------------------------
+    # DISPATCH
+    # ------------------------------
+    def fetch(self, url, domain):
+        """
+        Fetch url under domain's limits, without parsing it.
+
+        Returns:
+            tuple: (final URL after redirects, HTML), as from scrapers.fetch.fetch_page
+
+        Raises:
+            DomainUnavailable: If the domain is rate limited or its breaker is open
+            UnsafeURL: If the URL is refused; the breaker is left as it was
+            requests.RequestException: If the fetch fails
+        """
+        state = self._state(domain)
+        timeout = self._admit(domain, state)
+        started = time.monotonic()
+        latency = None
+        refused = False
+        try:
+            final_url, html = fetch_page(url, timeout=timeout)
+            latency = time.monotonic() - started
+        except UnsafeURL:
+            # Says nothing about the domain's health, good or bad
+            refused = True
+            raise
+        except requests.RequestException as e:
+            if not _is_domain_failure(e):
+                latency = time.monotonic() - started
+            raise
+        finally:
+            # Settled whatever fetch_page raised, so a half-open probe can
+            # never leave the breaker stuck in probing
+            if refused:
+                self._release(state)
+            else:
+                self._record(state, latency)
+        return final_url, html
+
+    def scrape(self, url, domain, pool=None, cancel=None):
+        """
+        Fetch and parse url under domain's limits.
+
+        Args:
+            pool: optional workers.WorkerPool to parse in
+            cancel: optional threading.Event; checked before the fetch and
+                between fetch and parse (a request in flight runs to its timeout)
+
+        Returns:
+            Dict: parsed article plus "url", its canonical URL after
+            redirects and rel=canonical; a copy served from the last-good
+            cache while the domain is failing carries "stale": True
+
+        Raises:
+            DomainUnavailable: If the domain is rate limited or its breaker is open
+                and no cached copy exists
+            requests.RequestException: If the fetch fails
+            ValueError: If the page has no recognizable article
+            ScrapeCancelled: If cancel is set
+        """
+        if cancel is not None and cancel.is_set():
+            raise ScrapeCancelled(url)
+        try:
+            final_url, html = self.fetch(url, domain)
+        except UnsafeURL:
+            raise
+        except requests.RequestException:
+            # Rate limited, breaker open or fetch failed: fall back to the last good copy
+            cached = self._cached(url)
+            if cached:
+                return cached
+            raise
+        if cancel is not None and cancel.is_set():
+            raise ScrapeCancelled(url)
+
+        # Shortlinks and other cross-host redirects are parsed for the host
+        # the page actually came from
+        final_domain = normalize_netloc(final_url) or domain
+        if pool is not None:
+            data = pool.parse(final_domain, html, final_url)
+        else:
+            data = parse_html(final_domain, html, final_url)
+        data["url"] = resolve_canonical(final_url, html)
+        self._remember(url, data)
+        self._remember(data["url"], data)
+        return data
+
+
+DISPATCHER = ScrapeDispatcher()
@@ -0,0 +1,98 @@
+"""
+Fetching article pages on a user's behalf.
+
+Any URL can be pasted into the app or sent to the API, so every fetch is
+checked before a connection is made: only http and https, and only hosts
+whose addresses are all public. Redirects are followed here one hop at a
+time so each hop gets the same check, and a public page cannot bounce the
+server to 127.0.0.1, 169.254.169.254 or an intranet name.
+"""
+
+import ipaddress
+import socket
+from urllib.parse import urljoin, urlsplit
+
+import requests
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0 Safari/537.36"
+    )
+}
+
+ALLOWED_SCHEMES = ("http", "https")
+MAX_REDIRECTS = 5
+
+
+class UnsafeURL(requests.exceptions.InvalidURL):
+    """Raised for URLs the server refuses to fetch (a ValueError as well as a RequestException)."""
+
+
+def resolve_host(host):
+    """Return the IP addresses a hostname resolves to."""
+    return {info[4][0] for info in socket.getaddrinfo(host, None)}
+
+
+def _is_public(address):
+    if address.version == 6 and address.ipv4_mapped is not None:
+        address = address.ipv4_mapped
+    return address.is_global and not address.is_multicast
+
+
+def check_url(url):
+    """
+    Refuse a URL unless it is http(s) and its host only resolves to public addresses.
+
+    Raises:
+        UnsafeURL: If the scheme is not allowed or the host is loopback,
+            private, link-local, reserved or otherwise not public
+        requests.ConnectionError: If the host cannot be resolved
+    """
+    parts = urlsplit(url)
+    if parts.scheme.lower() not in ALLOWED_SCHEMES or not parts.hostname:
+        raise UnsafeURL(f"Only http and https article URLs can be fetched: {url}")
+    host = parts.hostname
+    try:
+        addresses = [ipaddress.ip_address(host)]
+    except ValueError:
+        try:
+            # Scoped IPv6 results carry a "%<zone>" suffix
+            addresses = [ipaddress.ip_address(a.split("%", 1)[0]) for a in resolve_host(host)]
+        except (OSError, UnicodeError) as e:
+            raise requests.ConnectionError(f"Cannot resolve {host}: {e}")
+    if not addresses or not all(_is_public(address) for address in addresses):
+        raise UnsafeURL(f"Refusing to fetch {host}: not a public address")
+
+
+def fetch_page(url, timeout=10):
+    """
+    Fetch a page, checking the URL and every redirect hop with check_url().
+
+    Returns:
+        tuple: (final URL after redirects, HTML)
+
+    Raises:
+        UnsafeURL: If the URL or a redirect points somewhere not allowed
+        requests.RequestException: If the URL is malformed or the HTTP request fails
+    """
+    try:
+        for _ in range(MAX_REDIRECTS + 1):
+            check_url(url)
+            response = requests.get(url, headers=HEADERS, timeout=timeout, allow_redirects=False)
+            if not response.is_redirect:
+                break
+            response.close()
+            url = urljoin(url, response.headers["location"])
+        else:
+            raise requests.TooManyRedirects(f"More than {MAX_REDIRECTS} redirects")
+        response.raise_for_status()
+    except UnsafeURL:
+        raise
+    except requests.RequestException as e:
+        raise requests.RequestException(f"Failed to fetch page: {e}", response=e.response)
+    except ValueError as e:
+        # URLs urlsplit() or urllib3 cannot parse (e.g. LocationParseError for "http://a..b/")
+        raise requests.RequestException(f"Failed to fetch page: {e}")
+    return response.url, response.text
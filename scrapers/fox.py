@@ -1,38 +1,22 @@
-import requests
 from bs4 import BeautifulSoup
+from scrapers.boilerplate import clean_paragraphs
 from typing import Dict
 
 
-def scrape_fox_article(url: str) -> Dict[str, str]:
+def parse_fox_article(html: str) -> Dict[str, str]:
     """
-    Scrapes a Fox News article and returns the title and main text.
+    Parses the HTML of a Fox News article and returns the title and main text.
 
     Args:
-        url (str): URL of the Fox News article
+        html (str): page HTML of the Fox News article
 
     Returns:
-        Dict[str, str]: {"title": article_title, "text": article_text}
+        Dict[str, str]: {"title": article_title, "text": article_text, "quality": quality}
 
     Raises:
         ValueError: If the page structure is not as expected
-        requests.RequestException: If the request fails
     """
-
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/120.0 Safari/537.36"
-        )
-    }
-
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-    except requests.RequestException as e:
-        raise requests.RequestException(f"Failed to fetch page: {e}")
-
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = BeautifulSoup(html, "html.parser")
 
     # ---- Extract title ----
     title_tag = soup.find("h1")
@@ -51,7 +35,7 @@ def scrape_fox_article(url: str) -> Dict[str, str]:
     if not paragraphs:
         raise ValueError("No article paragraphs found")
 
-    article_text = "\n\n".join(p.get_text(strip=True) for p in paragraphs)
+    article_text, quality = clean_paragraphs(paragraphs, article_container)
 
     return {
         "title": title,
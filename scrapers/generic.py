@@ -0,0 +1,199 @@
+import json
+import threading
+
+from bs4 import BeautifulSoup
+from scrapers.boilerplate import clean_paragraphs
+from typing import Dict, Optional
+
+import db
+from urls import normalize_netloc
+
+ARTICLE_TYPES = {"Article", "NewsArticle", "ReportageNews", "AnalysisNewsArticle",
+                 "OpinionNewsArticle", "BlogPosting", "SatiricalArticle"}
+
+# JSON-LD bodies shorter than this are usually teasers, not the full article
+MIN_JSONLD_BODY = 400
+MIN_PARAGRAPH_CHARS = 25
+# Below this extraction quality a learned selector is re-checked against
+# full readability scoring, in case the site's layout changed (a fully kept
+# container needs about 300 characters to pass)
+MIN_LEARNED_QUALITY = 0.6
+
+# Learned per-domain container selectors, backed by the selector_cache table
+_selector_cache = {}
+_selector_lock = threading.Lock()
+
+
+def _iter_jsonld(soup):
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string or "")
+        except ValueError:
+            continue
+        stack = [data]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                stack.extend(node)
+            elif isinstance(node, dict):
+                yield node
+                if "@graph" in node:
+                    stack.append(node["@graph"])
+
+
+def extract_jsonld(soup) -> Dict[str, str]:
+    """Return {"title", "text"} from the first JSON-LD article object, if any."""
+    for node in _iter_jsonld(soup):
+        types = node.get("@type")
+        types = set(types) if isinstance(types, list) else {types}
+        if types & ARTICLE_TYPES:
+            return {
+                "title": str(node.get("headline") or "").strip(),
+                "text": str(node.get("articleBody") or "").strip(),
+            }
+    return {}
+
+
+def extract_meta_title(soup) -> str:
+    for attrs in ({"property": "og:title"}, {"name": "twitter:title"}):
+        tag = soup.find("meta", attrs=attrs)
+        if tag and tag.get("content"):
+            return tag["content"].strip()
+    h1 = soup.find("h1")
+    if h1:
+        return h1.get_text(strip=True)
+    return soup.title.get_text(strip=True) if soup.title else ""
+
+
+def _link_density(tag) -> float:
+    text_length = len(tag.get_text(strip=True))
+    link_chars = sum(len(a.get_text(strip=True)) for a in tag.find_all("a"))
+    return link_chars / max(text_length, 1)
+
+
+def find_content_container(soup):
+    """
+    Readability-style scoring: credit each paragraph's parent (and half to its
+    grandparent) by text length and comma count, then discount link-heavy nodes.
+    """
+    scores = {}
+    for p in soup.find_all("p"):
+        text = p.get_text(strip=True)
+        if len(text) < MIN_PARAGRAPH_CHARS:
+            continue
+        score = 1 + text.count(",") + min(len(text) / 100, 3)
+        parent = p.parent
+        if parent is None:
+            continue
+        scores[parent] = scores.get(parent, 0) + score
+        if parent.parent is not None:
+            scores[parent.parent] = scores.get(parent.parent, 0) + score / 2
+
+    best, best_score = None, 0.0
+    for node, score in scores.items():
+        if node.name in ("body", "html"):
+            continue
+        score *= 1 - _link_density(node)
+        if score > best_score:
+            best, best_score = node, score
+    return best
+
+
+def _is_specific(selector) -> bool:
+    # A bare tag name ("div") matches whatever comes first on the next page
+    return "#" in selector or "." in selector
+
+
+def selector_for(soup, node) -> Optional[str]:
+    """
+    Build an id or class selector that picks node as the first match, or
+    None. Bare tag names are never returned: they are too unspecific to
+    reuse on other pages of the site.
+    """
+    if node.get("id"):
+        candidates = [f"{node.name}#{node['id']}"]
+    else:
+        candidates = []
+    classes = [c for c in (node.get("class") or []) if c.replace("-", "").replace("_", "").isalnum()]
+    if classes:
+        candidates.append(node.name + "".join(f".{c}" for c in classes))
+    for selector in candidates:
+        try:
+            if soup.select_one(selector) is node:
+                return selector
+        except ValueError:
+            continue
+    return None
+
+
+def _cached_selector(domain):
+    with _selector_lock:
+        if domain not in _selector_cache:
+            selector = db.get_learned_selector(domain)
+            # Tag-only selectors learned by earlier versions are not trusted
+            _selector_cache[domain] = selector if selector and _is_specific(selector) else None
+        return _selector_cache[domain]
+
+
+def _learn_selector(domain, selector):
+    """Remember selector for domain; None forgets the domain's selector."""
+    with _selector_lock:
+        if _selector_cache.get(domain) == selector:
+            return
+        _selector_cache[domain] = selector
+    if selector is None:
+        db.delete_learned_selector(domain)
+    else:
+        db.save_learned_selector(domain, selector)
+
+
+def parse_generic_article(html: str, url: str) -> Dict[str, str]:
+    """
+    Parses the HTML of an article from a site without a dedicated scraper.
+
+    Args:
+        html (str): page HTML
+        url (str): URL the page was fetched from, used to key the learned selector
+
+    Returns:
+        Dict[str, str]: {"title": ..., "text": ..., "quality": ...}
+
+    Raises:
+        ValueError: If no article content can be found
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    domain = normalize_netloc(url)
+
+    # ---- Structured metadata ----
+    metadata = extract_jsonld(soup)
+    title = metadata.get("title") or extract_meta_title(soup)
+    if not title:
+        raise ValueError("Article title not found")
+
+    if len(metadata.get("text", "")) >= MIN_JSONLD_BODY:
+        return {"title": title, "text": metadata["text"], "quality": 1.0}
+
+    # ---- Learned selector, trusted while it extracts well ----
+    learned = None
+    selector = _cached_selector(domain)
+    container = soup.select_one(selector) if selector else None
+    if container is not None and container.find("p"):
+        learned = clean_paragraphs(container.find_all("p"), container)
+        if learned[1] >= MIN_LEARNED_QUALITY:
+            return {"title": title, "text": learned[0], "quality": learned[1]}
+
+    # ---- Full readability scoring, (re-)learning the selector ----
+    container = find_content_container(soup)
+    paragraphs = container.find_all("p") if container is not None else []
+    if not paragraphs:
+        if learned:
+            return {"title": title, "text": learned[0], "quality": learned[1]}
+        raise ValueError("Article content container not found")
+
+    article_text, quality = clean_paragraphs(paragraphs, container)
+    if learned and learned[1] >= quality:
+        return {"title": title, "text": learned[0], "quality": learned[1]}
+    # Forget a selector that stopped working if the new container has none
+    _learn_selector(domain, selector_for(soup, container))
+
+    return {"title": title, "text": article_text, "quality": quality}
@@ -5,40 +5,24 @@ Created on Wed Jan 14 12:27:40 2026
 @author: Oreoluwa
 """
 
-import requests
 from bs4 import BeautifulSoup
+from scrapers.boilerplate import clean_paragraphs
 from typing import Tuple
 
-def scrape_punch_article(url: str) -> Tuple[str, str]:
+def parse_punch_article(html: str) -> Tuple[str, str]:
     """
-    Scrapes a PunchNG article and returns the title and main text.
+    Parses the HTML of a PunchNG article and returns the title and main text.
 
     Args:
-        url (str): URL of the Punch article
+        html (str): page HTML of the Punch article
 
     Returns:
         Tuple[str, str]: (title, article_text)
 
     Raises:
         ValueError: If article structure isn't found
-        requests.RequestException: If network request fails
     """
-
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/120.0 Safari/537.36"
-        )
-    }
-
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-    except requests.RequestException as e:
-        raise requests.RequestException(f"Failed to fetch page: {e}")
-
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = BeautifulSoup(html, "html.parser")
 
     # ---- Extract the title ----
     title_tag = soup.find("h1")
@@ -55,11 +39,10 @@ def scrape_punch_article(url: str) -> Tuple[str, str]:
     if not article_paragraphs:
         raise ValueError("Article body paragraphs not found on PunchNG")
 
-    article_text = "\n\n".join(
-        p.get_text(strip=True) for p in article_paragraphs
-    )
+    article_text, quality = clean_paragraphs(article_paragraphs)
 
     return {
             "title": title,
             "text": article_text,
+            "quality": quality,
         }
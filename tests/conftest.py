@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Shared fixtures. Tests run offline: sites are served from tests/fixtures
+by bench/stub_server.py acting as an HTTP proxy, and every test gets its
+own scratch database.
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "bench"))
+
+import db  # noqa: E402
+import scoring  # noqa: E402
+from scrapers import fetch  # noqa: E402
+from stub_server import start_server  # noqa: E402
+
+# Fixture sites are reached through the stub proxy and never resolved;
+# scrapers.fetch.check_url() sees them at this public address instead
+FIXTURE_SITE_ADDRESS = "93.184.216.34"
+
+
+def fixture_path(*parts):
+    return os.path.join(FIXTURES, *parts)
+
+
+def read_fixture(*parts):
+    with open(fixture_path(*parts), encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """A scratch directory with a fresh app_data.db."""
+    monkeypatch.chdir(tmp_path)
+    db.init_db()
+    return tmp_path
+
+
+@pytest.fixture(scope="session")
+def models():
+    return scoring.load_models(ROOT)
+
+
+@pytest.fixture
+def site_proxy(monkeypatch):
+    """Serve tests/fixtures/sites/<domain>/<path> for http://<domain>/<path> through HTTP_PROXY."""
+    server = start_server(fixture_path("sites"))
+    monkeypatch.setenv("HTTP_PROXY", f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.delenv("NO_PROXY", raising=False)
+    monkeypatch.delenv("no_proxy", raising=False)
+    monkeypatch.setattr(fetch, "resolve_host", lambda host: {FIXTURE_SITE_ADDRESS})
+    yield server
+    server.shutdown()
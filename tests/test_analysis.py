@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import analysis
+import db
+
+URL = "http://punchng.com/news/senate-approves-budget.html"
+
+
+def test_scraped_articles_carry_extraction_quality(workdir, site_proxy):
+    article = analysis.fetch_article(URL)
+
+    assert article["title"] == "Senate approves 2026 budget after marathon debate"
+    assert 0 < article["quality"] <= 1
+
+
+def test_manual_input_has_no_extraction_quality(workdir):
+    article = analysis.fetch_article("", "Senate approves budget", "The Senate approved the budget.")
+
+    assert article["quality"] is None
+
+
+def test_cache_hits_carry_the_scored_text(workdir):
+    db.cache_verdicts([(URL, "Senate approves budget", "real", 0.1, 0.2, "The Senate approved the budget.")])
+
+    # No site_proxy: a cache hit is not scraped
+    article = analysis.fetch_article(URL)
+
+    assert article["text"] == "The Senate approved the budget."
+    assert article["cached"][4] == article["text"]
+
+
+def test_the_submitted_url_is_fetched_and_the_canonical_one_is_the_key(workdir, monkeypatch):
+    fetched = []
+
+    def scrape(url, domain, pool=None, cancel=None):
+        fetched.append(url)
+        return {"title": "Senate approves budget", "text": "The Senate approved the budget.",
+                "url": "https://punchng.com/news/?page=2"}
+
+    monkeypatch.setattr(analysis.DISPATCHER, "scrape", scrape)
+    article = analysis.fetch_article("https://m.punchng.com/news/amp/?utm_source=x&page=2")
+
+    assert fetched == ["https://m.punchng.com/news/amp/?page=2"]
+    assert article["url"] == "https://punchng.com/news/?page=2"
+
+
+def test_staged_scoring_matches_score_articles(workdir, models):
+    article = analysis.fetch_article("", "Senate approves budget", "The Senate approved the budget on Tuesday.")
+
+    stages = list(analysis.score_in_stages(models, article))
+
+    assert [stage for stage, _ in stages] == ["satire", "result"]
+    satire, result = stages[0][1], stages[1][1]
+    assert result == analysis.score_articles(models, [article])[0]
+    assert satire["satire_prob"] == result["satire_prob"]
+    assert satire["satire_warn"] == result["satire_warn"]
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+import db
+import scoring
+from conftest import ROOT
+
+ARTICLE = {
+    "title": "Senate approves 2026 budget after marathon debate",
+    "text": "The Senate on Tuesday approved the appropriation bill after a long debate.",
+}
+
+
+@pytest.fixture
+def client(workdir, monkeypatch):
+    for name in scoring.MODEL_FILES:
+        os.symlink(os.path.join(ROOT, name), name)
+    monkeypatch.setattr(api, "USE_PROCESSES", False)
+    db.add_user("alice", "alice-pw")
+    db.add_user("bob", "bob-pw")
+    with TestClient(api.app) as client:
+        yield client
+
+
+def _key(client, username):
+    response = client.post("/keys", json={"username": username, "password": f"{username}-pw"})
+    assert response.status_code == 200
+    return {"X-API-Key": response.json()["api_key"]}
+
+
+def test_endpoints_need_an_api_key(client):
+    assert client.post("/analyze", json=ARTICLE).status_code == 401
+    assert client.get("/history").status_code == 401
+    assert client.get("/search", params={"q": "budget"}).status_code == 401
+    assert client.get("/history", headers={"X-API-Key": "not-a-key"}).status_code == 401
+    assert client.post("/keys", json={"username": "alice", "password": "wrong"}).status_code == 401
+
+
+def test_history_and_search_only_show_the_callers_rows(client):
+    alice, bob = _key(client, "alice"), _key(client, "bob")
+
+    response = client.post("/analyze", json={**ARTICLE, "save": True}, headers=alice)
+    assert response.status_code == 200
+    assert response.json()["history_id"] is not None
+    # A client-supplied user_id is ignored
+    client.post("/analyze", json={**ARTICLE, "save": True, "user_id": 2}, headers=alice)
+
+    assert len(client.get("/history", headers=alice).json()["history"]) == 2
+    assert client.get("/history", headers=bob).json()["history"] == []
+    assert len(client.get("/search", params={"q": "budget"}, headers=alice).json()["results"]) == 2
+    assert client.get("/search", params={"q": "budget"}, headers=bob).json()["results"] == []
+
+
+def test_unexpected_error_fails_only_its_batch_item(client, monkeypatch):
+    fetch_article = api.analysis.fetch_article
+
+    def broken_parser(url="", title="", text="", pool=None):
+        if url:
+            raise AttributeError("'NoneType' object has no attribute 'get_text'")
+        return fetch_article(url, title, text, pool)
+
+    monkeypatch.setattr(api.analysis, "fetch_article", broken_parser)
+    response = client.post(
+        "/analyze/batch",
+        json={"items": [{"url": "https://news.example/broken"}, ARTICLE]},
+        headers=_key(client, "alice"),
+    )
+
+    assert response.status_code == 200
+    broken, scored = response.json()["results"]
+    assert broken["status"] == 500
+    assert "verdict" in scored
+
+
+def test_revoked_key_stops_working(client):
+    alice = _key(client, "alice")
+
+    assert client.delete("/keys", headers=alice).status_code == 200
+    assert client.get("/history", headers=alice).status_code == 401
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+from bs4 import BeautifulSoup
+
+from conftest import read_fixture
+from scrapers.boilerplate import clean_paragraphs
+from scrapers.punch import parse_punch_article
+
+BODY = (
+    "The Federal Government on Wednesday unveiled a N2tn plan",
+    "The Minister of Works, who spoke at a briefing in Abuja",
+    "According to him, the plan will be funded",
+    "Road users in the South-East and North-Central",
+    "The minister said the ministry would publish monthly progress reports",
+)
+CHROME = (
+    "We use cookies",
+    "Accept all cookies",
+    "Metro Plus",
+    "By Tunde Ajaja",
+    "Share this",
+    "READ ALSO",
+    "Download our app",
+    "Lagos announces new traffic plan",
+    "Kano flood",
+    "All rights reserved",
+    "Follow us on",
+)
+
+
+def _page():
+    return read_fixture("pages", "punch_article.html")
+
+
+def test_punch_parser_keeps_body_and_drops_chrome():
+    data = parse_punch_article(_page())
+
+    assert data["title"] == "FG unveils N2tn plan to fix federal roads"
+    for sentence in BODY:
+        assert sentence in data["text"]
+    for chrome in CHROME:
+        assert chrome not in data["text"]
+    assert data["text"].split("\n\n")[0].startswith(BODY[0])
+    assert data["quality"] > 0.5
+
+
+def test_whole_page_paragraphs_shrink_to_the_body():
+    # The fallback when a page has no <article>: every <p> on the page
+    paragraphs = BeautifulSoup(_page(), "html.parser").find_all("p")
+    raw = "\n\n".join(p.get_text(strip=True) for p in paragraphs)
+
+    text, quality = clean_paragraphs(paragraphs)
+
+    assert [paragraph[:40] for paragraph in text.split("\n\n")] == [sentence[:40] for sentence in BODY]
+    # Less text for the vectorizers to transform: over a third of the page is
+    # chrome. bench/bench_extraction.py measures the scoring-latency effect.
+    assert len(text) < 0.65 * len(raw)
+    assert 0 < quality < 1
+
+
+def test_all_boilerplate_is_kept_with_zero_quality():
+    soup = BeautifulSoup("<nav><p><a href='/'>Home</a></p><p><a href='/news'>News</a></p></nav>", "html.parser")
+
+    text, quality = clean_paragraphs(soup.find_all("p"))
+
+    assert text == "Home\n\nNews"
+    assert quality == 0.0
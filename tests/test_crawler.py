@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+import db
+from conftest import read_fixture
+from crawler import Crawler, parse_feed
+from scrapers.dispatch import ScrapeDispatcher
+
+
+def test_parse_feed_rss():
+    assert parse_feed(read_fixture("feeds", "rss.xml")) == [
+        "https://punchng.com/senate-approves-2026-budget/",
+        "https://punchng.com/flooding-displaces-thousands/",
+    ]
+
+
+def test_parse_feed_atom_prefers_alternate_link():
+    assert parse_feed(read_fixture("feeds", "atom.xml")) == [
+        "https://theonion.com/area-man-kitchen-president/",
+        "https://theonion.com/nations-dogs-demand-answers/",
+    ]
+
+
+def test_parse_feed_sitemap():
+    assert parse_feed(read_fixture("feeds", "sitemap.xml").encode("utf-8")) == [
+        "https://www.bbc.com/news/articles/c1",
+        "https://www.bbc.com/news/articles/c2",
+    ]
+
+
+def test_crawl_once_scores_and_caches_new_articles(workdir, models, site_proxy):
+    crawler = Crawler(
+        models,
+        feeds={"punchng.com": ["http://punchng.com/feed.xml"]},
+        dispatcher=ScrapeDispatcher(rate=100.0),
+    )
+
+    # The missing article is logged and skipped; the other is scored
+    assert crawler.crawl_once() == 1
+    cached = db.get_cached_verdict("http://punchng.com/news/senate-approves-budget.html")
+    assert cached is not None
+    assert cached[0] == "Senate approves 2026 budget after marathon debate"
+    assert cached[1] in ("satire", "fake", "unverified", "real")
+    assert "appropriation bill" in cached[4]
+
+    # Already cached articles are not scraped again
+    assert crawler.crawl_once() == 0
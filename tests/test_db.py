@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+import csv
+import gzip
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import db
+import history_io
+
+
+def _search_ids(query, user_id=1):
+    return [row[0] for row in db.search_history(query, user_id)]
+
+
+def test_history_writes_do_not_need_unzip_text(workdir):
+    history_id = db.add_history(1, "https://punchng.com/a", "Senate passes budget", "real", 0.1, 0.2,
+                                text="Lawmakers approved the appropriation bill on Tuesday")
+
+    # A plain sqlite3 connection has no unzip_text(); writing history must still work
+    conn = sqlite3.connect(db.DB_FILE)
+    conn.execute("""
+        INSERT INTO history (user_id, title, verdict, timestamp) VALUES (1, 'Manual row', 'real', datetime('now'))
+    """)
+    conn.commit()
+    conn.close()
+
+    assert _search_ids("appropriation") == [history_id]
+    assert _search_ids("budget") == [history_id]
+    assert _search_ids("budget", user_id=2) == []
+
+
+def test_deleted_rows_drop_out_of_search(workdir):
+    history_id = db.add_history(1, None, "Flood displaces thousands", "real", 0.1, 0.2, text="Kogi")
+
+    conn = sqlite3.connect(db.DB_FILE)
+    conn.execute("DELETE FROM history WHERE id=?", (history_id,))
+    conn.commit()
+    conn.close()
+
+    assert _search_ids("flood") == []
+
+
+def test_import_indexes_only_inserted_rows(workdir):
+    db.add_history(1, None, "Senate passes budget", "real", 0.1, 0.2, text="appropriation bill")
+    history_io.export_history("history.csv.gz")
+
+    # Every id already exists: all rows are skipped and nothing is indexed twice
+    assert history_io.import_history("history.csv.gz", keep_ids=True) == 0
+    assert len(_search_ids("appropriation")) == 1
+
+    assert history_io.import_history("history.csv.gz") == 1
+    assert len(_search_ids("appropriation")) == 2
+
+
+
+def _history_rows():
+    conn = db.connect()
+    rows = list(history_io.iter_history_chunks(conn, 100))
+    conn.close()
+    return [row for chunk in rows for row in chunk]
+
+
+@pytest.mark.parametrize("name", ["history.csv.gz", "history.parquet"])
+def test_import_round_trips_an_export(workdir, name):
+    if name.endswith(".parquet"):
+        pytest.importorskip("pyarrow")
+    db.add_history(1, "https://punchng.com/a", "Senate passes budget", "real", 0.1, 0.2,
+                   text="appropriation bill")
+    db.add_history(2, None, "Flood displaces thousands", "fake", 0.3, 0.9)
+    exported = _history_rows()
+    assert history_io.export_history(name, chunk_size=1) == 2
+
+    conn = sqlite3.connect(db.DB_FILE)
+    conn.execute("DELETE FROM history")
+    conn.commit()
+    conn.close()
+    assert history_io.import_history(name, keep_ids=True, chunk_size=1) == 2
+    assert _history_rows() == exported
+    assert _search_ids("appropriation") == [exported[0][0]]
+
+    # Without keep_ids the rows come back as copies with fresh ids
+    assert history_io.import_history(name, chunk_size=1) == 2
+    rows = _history_rows()
+    assert [row[1:] for row in rows] == [row[1:] for row in exported] * 2
+    assert len({row[0] for row in rows}) == 4
+
+
+def test_reimport_of_existing_rows_stores_no_blobs(workdir):
+    history_id = db.add_history(1, None, "Senate passes budget", "real", 0.1, 0.2, text="appropriation bill")
+    history_io.export_history("history.csv.gz")
+    with gzip.open("history.csv.gz", "rt", newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    # The same id with a body the database has never seen
+    rows[1][-1] = "a revised body"
+    with gzip.open("history.csv.gz", "wt", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows(rows)
+
+    blobs = _blob_count()
+    assert history_io.import_history("history.csv.gz", keep_ids=True) == 0
+    assert _blob_count() == blobs
+    assert _search_ids("revised") == []
+    assert _search_ids("appropriation") == [history_id]
+
+def _blob_count():
+    conn = sqlite3.connect(db.DB_FILE)
+    count = conn.execute("SELECT COUNT(*) FROM article_blobs").fetchone()[0]
+    conn.close()
+    return count
+
+
+def test_blobs_are_deleted_with_their_last_reference(workdir):
+    first = db.add_history(1, None, "Budget", "real", 0.1, 0.2, text="shared body")
+    second = db.add_history(2, None, "Budget", "real", 0.1, 0.2, text="shared body")
+    assert _blob_count() == 1
+
+    conn = sqlite3.connect(db.DB_FILE)
+    conn.execute("DELETE FROM history WHERE id=?", (first,))
+    conn.commit()
+    assert _blob_count() == 1
+    conn.execute("UPDATE history SET body_hash=NULL WHERE id=?", (second,))
+    conn.commit()
+    conn.close()
+    assert _blob_count() == 0
+
+
+def test_history_version_follows_each_users_newest_row(workdir):
+    assert db.get_history_version(1) == 0
+    first = db.add_history(1, None, "Budget", "real", 0.1, 0.2)
+    db.add_history(2, None, "Flood", "real", 0.1, 0.2)
+    assert db.get_history_version(1) == first
+
+    # Rows written outside db.add_history (another process, the API) count too
+    conn = sqlite3.connect(db.DB_FILE)
+    cursor = conn.execute("""
+        INSERT INTO history (user_id, title, verdict, timestamp) VALUES (1, 'Manual row', 'real', datetime('now'))
+    """)
+    conn.commit()
+    conn.close()
+    assert db.get_history_version(1) == cursor.lastrowid
+
+
+def test_text_round_trips_across_threads():
+    texts = [f"Article {i}: " + "the senate passed the budget " * (i % 500 + 1) for i in range(2000)]
+
+    def round_trip(text):
+        digest, blob = db.encode_text(text)
+        return db.decompress_text(blob)
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        assert list(pool.map(round_trip, texts)) == texts
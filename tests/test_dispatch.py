@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+import threading
+
+import pytest
+
+from scrapers import dispatch
+from scrapers.dispatch import ScrapeCancelled, ScrapeDispatcher
+from scrapers.fetch import UnsafeURL
+
+URL = "http://punchng.com/news/senate-approves-budget.html"
+
+
+def test_cancel_during_fetch_stops_before_parsing(workdir, site_proxy, monkeypatch):
+    site_proxy.RequestHandlerClass.latency = 0.5
+    parsed = []
+    monkeypatch.setattr(dispatch, "parse_html", lambda *args: parsed.append(args) or {})
+    cancel = threading.Event()
+    threading.Timer(0.1, cancel.set).start()
+
+    with pytest.raises(ScrapeCancelled):
+        ScrapeDispatcher().scrape(URL, "punchng.com", cancel=cancel)
+    assert parsed == []
+
+
+def test_cancelled_before_start_does_not_fetch(workdir, site_proxy):
+    cancel = threading.Event()
+    cancel.set()
+    dispatcher = ScrapeDispatcher()
+
+    with pytest.raises(ScrapeCancelled):
+        dispatcher.scrape(URL, "punchng.com", cancel=cancel)
+    assert dispatcher.status("punchng.com")["tokens"] == dispatch.BURST
+
+
+def test_unexpected_fetch_error_ends_the_probe(monkeypatch):
+    dispatcher = ScrapeDispatcher()
+    state = dispatcher._state("punchng.com")
+    state.opened_at = dispatch.time.monotonic() - dispatch.COOLDOWN
+
+    def broken_fetch(url, timeout):
+        raise RuntimeError("not a RequestException")
+
+    monkeypatch.setattr(dispatch, "fetch_page", broken_fetch)
+    with pytest.raises(RuntimeError):
+        dispatcher.scrape(URL, "punchng.com")
+
+    # The probe failed: the breaker re-opens instead of staying half-open for good
+    assert not state.probing
+    assert dispatcher.status("punchng.com")["open"]
+
+
+def test_refused_url_leaves_an_open_breaker_open(monkeypatch):
+    dispatcher = ScrapeDispatcher()
+    state = dispatcher._state("punchng.com")
+    state.opened_at = dispatch.time.monotonic() - dispatch.COOLDOWN
+    state.failures = dispatch.FAILURE_THRESHOLD
+
+    def refused_fetch(url, timeout):
+        raise UnsafeURL("Refusing to fetch punchng.com: not a public address")
+
+    monkeypatch.setattr(dispatch, "fetch_page", refused_fetch)
+    with pytest.raises(UnsafeURL):
+        dispatcher.scrape(URL, "punchng.com")
+
+    # Neither a success nor a failure: no latency sample, the breaker stays open
+    assert not state.probing
+    assert dispatcher.status("punchng.com")["open"]
+    assert dispatcher.status("punchng.com")["samples"] == 0
+    assert state.failures == dispatch.FAILURE_THRESHOLD
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+import analysis
+import scoring
+from domain_index import DomainIndex
+
+
+def _index(counts):
+    """A DomainIndex holding {domain: {verdict: n}} without touching the database."""
+    index = DomainIndex()
+    history_id = 0
+    for domain, verdicts in counts.items():
+        for verdict, n in verdicts.items():
+            for _ in range(n):
+                history_id += 1
+                index.record(domain, verdict, history_id, snapshot=False)
+    return index
+
+
+MIX = {"satire": 30, "fake": 35, "real": 35}
+
+
+def test_domain_matching_the_global_mix_is_not_shifted():
+    index = _index({"a.com": MIX, "b.com": MIX})
+
+    satire_shift, fake_shift = index.adjustments(["a.com"])["a.com"]
+    assert satire_shift == pytest.approx(0, abs=0.01)
+    assert fake_shift == pytest.approx(0, abs=0.01)
+
+
+def test_unknown_domains_get_the_global_rates():
+    index = _index({"a.com": MIX})
+
+    assert index.priors("unknown.com") == index.base_rates()
+    assert index.adjustments(["unknown.com"]) == {}
+
+
+def test_learned_shifts_add_to_the_static_table():
+    index = _index({"theonion.com": {"satire": 40}, "punchng.com": {"real": 40}})
+
+    table = index.adjustments(["theonion.com", "punchng.com"], base=scoring.DOMAIN_ADJUSTMENTS)
+    learned = index.adjustments(["theonion.com"])["theonion.com"]
+    assert learned[0] > 0
+    assert table["theonion.com"] == pytest.approx(
+        (scoring.DOMAIN_ADJUSTMENTS["theonion.com"][0] + learned[0],
+         scoring.DOMAIN_ADJUSTMENTS["theonion.com"][1] + learned[1])
+    )
+    assert table["punchng.com"][0] < 0
+
+
+def test_short_circuit_only_for_overwhelmingly_known_domains():
+    index = _index({"theonion.com": {"satire": 40}, "punchng.com": {"real": 40}, "new.com": {"satire": 5}})
+
+    assert index.short_circuit("theonion.com")["verdict"] == "satire"
+    assert index.short_circuit("new.com") is None
+    assert index.short_circuit("unknown.com") is None
+
+
+def test_score_group_reads_the_learned_shifts_once(models):
+    class Index:
+        calls = 0
+
+        def adjustments(self, domains, base=None):
+            # Each read returns different shifts, as a snapshot in between would
+            self.calls += 1
+            return scoring.combine_adjustments(base or {}, {"punchng.com": (0.0, 2.0 * self.calls)})
+
+    index = Index()
+    articles = [{"title": "Senate approves budget", "text": "The Senate approved the budget.", "domain": "punchng.com"}]
+
+    result = analysis._score_group(models, articles, [0], index)[0]
+
+    assert index.calls == 1
+    unshifted = scoring.unshifted_verdicts([result], ["punchng.com"], {"punchng.com": (0.0, 2.0)})
+    assert result["index_verdict"] == unshifted[0]
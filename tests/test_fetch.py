@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from scrapers import fetch
+from scrapers.fetch import UnsafeURL, check_url, fetch_page
+
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1:8000/admin",
+    "http://localhost/",
+    "http://[::1]:8080/",
+    "http://[::ffff:127.0.0.1]/",
+    "http://169.254.169.254/latest/meta-data/",
+    "http://10.0.0.5/",
+    "http://192.168.1.1/",
+    "http://100.64.0.1/",
+    "http://0.0.0.0/",
+    "file:///etc/passwd",
+    "ftp://example.com/",
+    "gopher://example.com/",
+])
+def test_check_url_refuses_non_public_targets(url):
+    with pytest.raises(UnsafeURL):
+        check_url(url)
+
+
+def test_check_url_refuses_names_resolving_to_private_addresses(monkeypatch):
+    monkeypatch.setattr(fetch, "resolve_host", lambda host: {"93.184.216.34", "10.1.2.3"})
+    with pytest.raises(UnsafeURL):
+        check_url("https://intranet.example/")
+
+    monkeypatch.setattr(fetch, "resolve_host", lambda host: {"93.184.216.34"})
+    check_url("https://news.example/story")
+
+
+def test_unsafe_url_is_a_client_error():
+    # api.py maps ValueError to 422 and the dispatcher does not count it against the domain
+    assert issubclass(UnsafeURL, ValueError)
+    assert issubclass(UnsafeURL, requests.RequestException)
+
+
+def test_redirect_hops_are_checked(monkeypatch):
+    requested = []
+
+    class Redirector(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requested.append(self.path)
+            self.send_response(302)
+            self.send_header("Location", "http://169.254.169.254/latest/meta-data/")
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Redirector)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        # news.example is a public site reached through a proxy that redirects
+        monkeypatch.setenv("HTTP_PROXY", f"http://127.0.0.1:{server.server_address[1]}")
+        monkeypatch.delenv("NO_PROXY", raising=False)
+        monkeypatch.delenv("no_proxy", raising=False)
+        monkeypatch.setattr(fetch, "resolve_host", lambda host: {"93.184.216.34"})
+        with pytest.raises(UnsafeURL):
+            fetch_page("http://news.example/story")
+    finally:
+        server.shutdown()
+    assert requested == ["http://news.example/story"]
+
+
+@pytest.mark.parametrize("url", ["http://a..b/", "http://[::1/"])
+def test_malformed_urls_raise_request_exceptions(url, monkeypatch):
+    monkeypatch.setattr(fetch, "resolve_host", lambda host: {"93.184.216.34"})
+    with pytest.raises(requests.RequestException):
+        fetch_page(url)
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+import db
+from scrapers import generic
+
+BODY = "<p>{}</p>".format(
+    "The council said on Monday that the new market would open in March, after delays caused by funding, "
+    "and traders welcomed the news after years of waiting."
+) * 6
+URL = "https://news.example/story"
+
+
+def _page(body_attrs):
+    return (
+        "<html><head><title>Market to open in March</title></head><body>"
+        "<div><p>Short promo text here.</p></div>"
+        f"<div{body_attrs}>{BODY}</div>"
+        "</body></html>"
+    )
+
+
+@pytest.fixture(autouse=True)
+def selector_cache(workdir, monkeypatch):
+    monkeypatch.setattr(generic, "_selector_cache", {})
+
+
+def test_learns_class_selector():
+    data = generic.parse_generic_article(_page(' class="story-body"'), URL)
+
+    assert "new market would open in March" in data["text"]
+    assert db.get_learned_selector("news.example") == "div.story-body"
+
+
+def test_never_learns_tag_only_selector():
+    generic.parse_generic_article(_page(""), URL)
+
+    assert db.get_learned_selector("news.example") is None
+
+
+def test_ignores_stored_tag_only_selector():
+    db.save_learned_selector("news.example", "div")
+
+    data = generic.parse_generic_article(_page(""), URL)
+
+    assert "new market would open in March" in data["text"]
+    assert data["quality"] >= generic.MIN_LEARNED_QUALITY
+
+
+def test_relearns_when_learned_selector_extracts_poorly():
+    db.save_learned_selector("news.example", "div.old-layout")
+    page = _page(' id="main-story"').replace("<div>", '<div class="old-layout">', 1)
+
+    data = generic.parse_generic_article(page, URL)
+
+    assert "new market would open in March" in data["text"]
+    assert db.get_learned_selector("news.example") == "div#main-story"
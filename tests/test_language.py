@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from language import detect
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Don King said the fun run in Ko Samui was fun, and Don was in a fun mood all day.", "en"),
+    ("Im Jong-un and Dis Dat Records: fun facts from the Don Bosco school in Na Trang", "en"),
+    ("Wetin dey happen for Lagos? Dem no sabi wetin una dey talk, abi? Na wahala o.", "pcm"),
+    ("Àwọn ọlọ́pàá ti mú àwọn afurasí mẹ́ta ní ìlú Èkó lẹ́yìn ìjà tó wáyé pẹ̀lú àwọn ará àdúgbò náà.", "yo"),
+    ("Shugaban kasa ya ce gwamnatin tarayya za ta ci gaba da aiki domin inganta tsaro a cikin kasar.", "ha"),
+])
+def test_detect(text, expected):
+    assert detect("", text) == expected
+
+
+def test_one_repeated_marker_is_not_enough():
+    assert detect("", "The crowd chanted wahala wahala wahala as the wahala spread across the city") == "en"
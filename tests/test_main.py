@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+
+import analysis
+import db
+import scoring
+from conftest import ROOT
+
+AppTest = pytest.importorskip("streamlit.testing.v1").AppTest
+import streamlit as st  # noqa: E402
+
+TITLE = "Senate approves 2026 budget after marathon debate"
+TEXT = "The Senate on Tuesday approved the appropriation bill after a long debate."
+
+
+@pytest.fixture
+def app(workdir, monkeypatch):
+    for name in scoring.MODEL_FILES:
+        os.symlink(os.path.join(ROOT, name), name)
+    db.add_user("alice", "alice-pw")
+    st.cache_resource.clear()
+    app = AppTest.from_file(os.path.join(ROOT, "main.py"), default_timeout=120)
+    app.session_state["user_id"] = 1
+    app.session_state["username"] = "alice"
+    app.run()
+    app.text_input[1].set_value(TITLE)
+    app.text_area[0].set_value(TEXT)
+    yield app
+    st.cache_resource.clear()
+
+
+def _rendered(app):
+    """Headline, timeline steps and verdict text, in page order."""
+    return [element.value for element in app.main if element.type in ("subheader", "markdown")]
+
+
+def test_headline_and_satire_render_before_credibility_is_scored(app, monkeypatch):
+    stages = analysis.score_in_stages
+
+    def fake_model_fails(*args):
+        for stage, payload in stages(*args):
+            if stage == "result":
+                raise RuntimeError("credibility scoring still running")
+            yield stage, payload
+
+    monkeypatch.setattr(analysis, "score_in_stages", fake_model_fails)
+    app.button[0].click().run()
+
+    rendered = _rendered(app)
+    assert rendered[0] == TITLE
+    assert any("Satire Detection" in value for value in rendered)
+    assert not any("Credibility" in value for value in rendered)
+
+
+def test_steps_render_in_order_and_reruns_replay_them(app, monkeypatch):
+    app.button[0].click().run()
+    rendered = _rendered(app)
+    order = [
+        next(i for i, value in enumerate(rendered) if marker in value)
+        for marker in (TITLE, "Satire Detection", "Credibility", "Likely ")
+    ]
+    assert order == sorted(order)
+    assert any("Verdict in" in caption.value for caption in app.caption)
+
+    calls = []
+    monkeypatch.setattr(analysis, "score_in_stages", lambda *args: calls.append(args) or iter(()))
+    app.run()
+    assert calls == []
+    assert _rendered(app) == rendered
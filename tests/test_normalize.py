@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from normalize import normalize_text
+
+
+@pytest.mark.parametrize("text", ["àpapọ̀", "pẹ̀lú àwọn ọmọ", "Ìbàdàn", "Kò sí ìṣòro"])
+def test_yoruba_tone_marks_are_kept(text):
+    assert normalize_text(text) == text
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("f̶a̶k̶e̶ news", "fake news"),  # strike-through on ASCII letters
+    ("z̷̢͉a̴l̸g̵o", "zalgo"),  # stacked marks
+    ("pẹ̀̀́lú", "pẹlú"),  # stacked on a non-ASCII letter
+    ("Ｆａｋｅ nеws", "Fake news"),  # fullwidth and Cyrillic e
+    ("f a k e news", "fake news"),
+    ("f.a.k.e news", "fake news"),
+    ("s\u200bc\u200ba\u200bm alert", "scam alert"),  # zero-width spaces
+])
+def test_obfuscation_is_undone(text, expected):
+    assert normalize_text(text) == expected
+
+
+@pytest.mark.parametrize("text", ["Plan A B C", "The U.S.A.", "N.A.S.A. launched", "x y z"])
+def test_short_runs_and_abbreviations_are_kept(text):
+    assert normalize_text(text) == text
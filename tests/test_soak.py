@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+import sqlite3
+
+import pytest
+import requests
+
+from scrapers.dispatch import DomainUnavailable
+from soak import Stats, failure_kind, timed_writes
+
+
+def test_failures_are_counted_by_kind():
+    stats = Stats()
+    errors = [
+        sqlite3.OperationalError("database is locked"),
+        sqlite3.OperationalError("database is locked"),
+        sqlite3.OperationalError("disk I/O error"),
+        DomainUnavailable("punchng.com is failing; retry in a little while"),
+        requests.ConnectionError("connection refused"),
+    ]
+    for error in errors:
+        stats.failed(failure_kind(error))
+
+    _, _, failures = stats.window()
+    assert failures == {
+        "database is locked": 2,
+        "sqlite error": 1,
+        "DomainUnavailable": 1,
+        "ConnectionError": 1,
+    }
+    # Each window starts from zero
+    assert stats.window()[2] == {}
+
+
+def test_failed_writes_are_timed_and_raised():
+    stats = Stats()
+
+    def locked():
+        raise sqlite3.OperationalError("database is locked")
+
+    with pytest.raises(sqlite3.OperationalError) as info:
+        timed_writes(stats, locked)()
+    stats.failed(failure_kind(info.value))
+
+    _, writes, failures = stats.window()
+    assert len(writes) == 1
+    assert failures == {"database is locked": 1}
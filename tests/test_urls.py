@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from urls import canonical_url, normalize_netloc, strip_tracking
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://www.bbc.com/news/articles/c1?utm_source=x", "https://bbc.com/news/articles/c1"),
+    ("https://bbc.com/news/articles/c1#top", "https://bbc.com/news/articles/c1"),
+    ("https://m.punchng.com/news/amp/", "https://punchng.com/news/"),
+    ("https://www-bbc-com.cdn.ampproject.org/c/s/www.bbc.com/news/a", "https://bbc.com/news/a"),
+    ("https://[::1]:8080/a", "https://[::1]:8080/a"),
+    ("http://[2001:DB8::1]:80/a?b=2&a=1", "http://[2001:db8::1]/a?a=1&b=2"),
+])
+def test_canonical_url(url, expected):
+    assert canonical_url(url) == expected
+
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://m.punchng.com/news/amp/?utm_source=x&page=2&fbclid=y", "https://m.punchng.com/news/amp/?page=2"),
+    ("https://www.bbc.com/news/a?b=2&a=1&amp=1", "https://www.bbc.com/news/a?b=2&a=1&amp=1"),
+    ("https://WWW.BBC.com/news/a#top", "https://WWW.BBC.com/news/a#top"),
+    ("", ""),
+])
+def test_strip_tracking_changes_nothing_else(url, expected):
+    assert strip_tracking(url) == expected
+
+@pytest.mark.parametrize("url", [
+    "https://www.bbc.com/news/articles/c1",
+    "https://WWW.Punchng.com:443/x",
+    "https://[::1]:8080/a",
+])
+def test_canonical_url_keeps_the_normalized_netloc(url):
+    canonical = canonical_url(url)
+    assert normalize_netloc(canonical) == normalize_netloc(url)
+    assert canonical_url(canonical) == canonical
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import types
+
+from workers import WorkerPool
+
+
+def test_workers_do_not_rerun_the_main_script(tmp_path, monkeypatch):
+    # Streamlit registers the running page script as __main__ without a spec
+    script = tmp_path / "page.py"
+    script.write_text("raise RuntimeError('page script re-run in a worker')\n")
+    page = types.ModuleType("__main__")
+    page.__file__ = str(script)
+    monkeypatch.setitem(sys.modules, "__main__", page)
+
+    pool = WorkerPool(1)
+    try:
+        assert not pool.in_process
+        assert pool.submit(os.getpid).result(timeout=120) != os.getpid()
+    finally:
+        pool.shutdown()
+    assert page.__spec__ is None
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+URL helpers shared by the scrapers, the scoring stage and the history index.
+
+canonical_url() reduces the many spellings of one article URL (tracking
+parameters, www., mobile and AMP hosts, AMP paths, Google AMP cache
+links) to a single form lexically. resolve_canonical() goes one step
+further once a page has been fetched, using the final URL after redirects
+and the page's rel=canonical link. Resolved forms are remembered in the
+url_aliases table (see db.get_url_aliases) so each alias is only resolved
+once.
+
+Both forms are only keys. Pages are fetched from the URL as given, with
+at most its tracking parameters removed (strip_tracking()).
+"""
+
+import html as html_lib
+import re
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlsplit, urlunsplit
+
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "igshid", "yclid", "twclid",
+    "mc_cid", "mc_eid", "_ga", "_gl", "ref_src", "ref_url", "cmpid", "ito",
+})
+TRACKING_PREFIXES = ("utm_",)
+MOBILE_HOST_PREFIXES = ("m.", "mobile.", "amp.")
+AMP_CACHE_SUFFIX = ".cdn.ampproject.org"
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# https://www-bbc-com.cdn.ampproject.org/c/s/www.bbc.com/news/... -> https://www.bbc.com/news/...
+_AMP_CACHE_PATH = re.compile(r"^/[cv]/(s/)?(.+)$")
+_HEAD_END = re.compile(r"</head\s*>", re.IGNORECASE)
+_LINK_TAG = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+_ATTR = re.compile(r"""([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""")
+
+
+def normalize_netloc(url):
+    """
+    Return the lower-cased host of a URL without port or leading "www.".
+
+    Args:
+        url (str): article URL (or an empty string for manual input)
+
+    Returns:
+        str: normalized netloc, "" when the URL has no host
+    """
+    if not url:
+        return ""
+    host = (urlparse(url.strip()).hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return host
+
+
+# ------------------------------
+# CANONICAL FORM
+# ------------------------------
+def _is_tracker(key):
+    key = key.lower()
+    return key in TRACKING_PARAMS or key.startswith(TRACKING_PREFIXES)
+
+
+def _is_tracking(key, value):
+    if _is_tracker(key):
+        return True
+    # AMP switches: ?amp, ?amp=1, ?outputType=amp
+    key = key.lower()
+    return key == "amp" or (key == "outputtype" and value.lower() == "amp")
+
+
+def strip_tracking(url):
+    """
+    Return url without its tracking parameters, otherwise as given.
+
+    This is the URL to fetch: host, path, fragment and the remaining
+    parameters are left alone, so the site serves the page the user
+    linked to.
+    """
+    url = (url or "").strip()
+    parts = urlsplit(url)
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    kept = [(key, value) for key, value in params if not _is_tracker(key)]
+    if len(kept) == len(params):
+        return url
+    return urlunsplit(parts._replace(query=urlencode(kept)))
+
+
+def _strip_amp_path(path):
+    if path.startswith("/amp/"):
+        path = path[4:]
+    trailing = path.endswith("/")
+    stripped = path.rstrip("/")
+    if stripped.endswith("/amp"):
+        path = stripped[:-4] + ("/" if trailing else "")
+    return path or "/"
+
+
+def _unwrap_amp_cache(path):
+    match = _AMP_CACHE_PATH.match(path)
+    if not match:
+        return None
+    return ("https://" if match.group(1) else "http://") + match.group(2)
+
+
+def canonical_url(url):
+    """
+    Return the lexical canonical form of an article URL.
+
+    Lower-cases scheme and host, drops default ports, fragments, tracking
+    and AMP query parameters, drops a leading "www." the way
+    normalize_netloc() does, maps m./mobile./amp. hosts to the main host,
+    removes /amp path segments, unwraps Google AMP cache links and sorts
+    the remaining query parameters. Strings without a host are returned
+    stripped but otherwise unchanged.
+    """
+    url = (url or "").strip()
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if not host:
+        return url
+    scheme = parts.scheme.lower()
+
+    if host.endswith(AMP_CACHE_SUFFIX):
+        unwrapped = _unwrap_amp_cache(parts.path)
+        if unwrapped:
+            return canonical_url(unwrapped)
+
+    # Same host as normalize_netloc(), so cache keys and domains agree
+    if host.startswith("www."):
+        host = host[4:]
+    for prefix in MOBILE_HOST_PREFIXES:
+        # Keep the prefix on bare two-label hosts like amp.dev
+        if host.startswith(prefix) and host.count(".") >= 2:
+            host = host[len(prefix):]
+            break
+
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if ":" in host:
+        # urlsplit() drops the brackets around IPv6 literals
+        host = f"[{host}]"
+    netloc = host if port in (None, DEFAULT_PORTS.get(scheme)) else f"{host}:{port}"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking(key, value)
+    )
+    return urlunsplit((scheme, netloc, _strip_amp_path(parts.path), urlencode(query), ""))
+
+
+# ------------------------------
+# RESOLUTION
+# ------------------------------
+def canonical_from_html(html, base_url):
+    """
+    Return the canonical form of a page's <link rel="canonical"> href, or None.
+
+    Only the <head> is scanned. A canonical pointing at the site root from
+    an article page is ignored, since some sites set it on every page.
+    """
+    end = _HEAD_END.search(html)
+    head = html[:end.start()] if end else html[:100000]
+    for tag in _LINK_TAG.finditer(head):
+        attrs = {
+            match.group(1).lower(): next(g for g in match.groups()[1:] if g is not None)
+            for match in _ATTR.finditer(tag.group(0))
+        }
+        if "canonical" not in attrs.get("rel", "").lower().split() or not attrs.get("href"):
+            continue
+        candidate = urljoin(base_url, html_lib.unescape(attrs["href"].strip()))
+        parts = urlsplit(candidate)
+        if parts.scheme not in DEFAULT_PORTS or not parts.hostname:
+            return None
+        if parts.path in ("", "/") and urlsplit(base_url).path not in ("", "/"):
+            return None
+        return canonical_url(candidate)
+    return None
+
+
+def resolve_canonical(final_url, html):
+    """Canonical URL of a fetched page: its rel=canonical, else the URL it redirected to."""
+    return canonical_from_html(html, final_url) or canonical_url(final_url)
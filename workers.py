@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Process pool for the CPU-bound parse and score work.
+
+BeautifulSoup parsing and the vectorizer transforms hold the GIL, so under
+load they serialize inside one server process. WorkerPool runs them in
+worker processes that load the four model pickles once at startup; callers
+send raw HTML or text and get back titles and probabilities.
+
+If worker processes cannot be started, or the pool breaks, work runs
+in-process instead.
+"""
+
+import contextlib
+import importlib.machinery
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import scoring
+from scrapers import parse_html
+
+# Models loaded once per worker process by _init_worker()
+_models = None
+
+
+class PoolBusy(RuntimeError):
+    """Raised when no pool slot frees up within the caller's timeout."""
+
+
+def _mp_context():
+    # Forking the multithreaded Streamlit or uvicorn process can copy a lock
+    # another thread holds and deadlock the child; forkserver forks workers
+    # from a clean single-threaded server instead. Windows only has spawn.
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+@contextlib.contextmanager
+def _main_left_alone():
+    # A forkserver or spawn child re-imports the parent's __main__ from its
+    # path before running anything. Under Streamlit that is whichever page
+    # script ran last, and re-running it outside a session raises and breaks
+    # the pool. Workers only run this module's functions, so a spec named
+    # "__main__" tells multiprocessing to leave __main__ alone while
+    # processes (and the fork server) are launched.
+    main = sys.modules.get("__main__")
+    if main is None or getattr(main, "__spec__", None) is not None:
+        yield
+        return
+    main.__spec__ = importlib.machinery.ModuleSpec("__main__", None)
+    try:
+        yield
+    finally:
+        main.__spec__ = None
+
+
+def _init_worker():
+    global _models
+    _models = scoring.load_models()
+
+
+def _parse(domain, html, url):
+    return parse_html(domain, html, url)
+
+
+def _score(titles, texts, domains, adjustments, satire_raw=None):
+    return scoring.score_batch(_models, titles, texts, domains, adjustments, satire_raw=satire_raw)
+
+
+def _parse_and_score(domain, html, url, adjustments):
+    data = parse_html(domain, html, url)
+    result = scoring.score_batch(
+        _models, [data.get("title", "")], [data.get("text", "")], [domain], adjustments
+    )[0]
+    return {**data, **result}
+
+
+class WorkerPool:
+    """
+    Args:
+        processes (int): worker processes, defaults to the CPU count
+        max_pending (int): submitted-but-unfinished jobs allowed before
+            callers block (backpressure), defaults to 4 per process
+        models: already loaded models for in-process fallback; loaded
+            lazily when None
+    """
+
+    def __init__(self, processes=None, max_pending=None, models=None):
+        self.processes = processes or os.cpu_count() or 1
+        self._slots = threading.BoundedSemaphore(max_pending or self.processes * 4)
+        self._models = models
+        self._lock = threading.Lock()
+        try:
+            self._pool = ProcessPoolExecutor(self.processes, mp_context=_mp_context(), initializer=_init_worker)
+        except (OSError, NotImplementedError):
+            self._pool = None
+
+    @property
+    def in_process(self):
+        return self._pool is None
+
+    def _run_local(self, fn, args):
+        global _models
+        with self._lock:
+            if self._models is None:
+                self._models = scoring.load_models()
+            _models = self._models
+        return fn(*args)
+
+    def submit(self, fn, *args, timeout=None):
+        """
+        Run fn(*args) in a worker, blocking while max_pending jobs are in flight.
+
+        Returns:
+            Future: resolves to fn's return value
+
+        Raises:
+            PoolBusy: If no slot frees up within timeout seconds
+        """
+        if not self._slots.acquire(timeout=timeout):
+            raise PoolBusy(f"worker pool saturated ({self.processes} processes)")
+
+        if self._pool is not None:
+            try:
+                # Worker processes are started on demand inside submit()
+                with _main_left_alone():
+                    future = self._pool.submit(fn, *args)
+                future.add_done_callback(lambda _: self._slots.release())
+                return future
+            except (BrokenProcessPool, RuntimeError):
+                # Pool died or was shut down: degrade to in-process for good
+                self._pool = None
+
+        future = Future()
+        try:
+            future.set_result(self._run_local(fn, args))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            self._slots.release()
+        return future
+
+    def _call(self, fn, *args, timeout=None):
+        future = self.submit(fn, *args, timeout=timeout)
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            self._pool = None
+            return self._run_local(fn, args)
+
+    def parse(self, domain, html, url, timeout=None):
+        """Extract {"title", "text", "quality"} from fetched HTML."""
+        return self._call(_parse, domain, html, url, timeout=timeout)
+
+    def score(self, titles, texts, domains=None, adjustments=None, satire_raw=None, timeout=None):
+        """scoring.score_batch() in a worker."""
+        return self._call(_score, titles, texts, domains, adjustments, satire_raw, timeout=timeout)
+
+    def parse_and_score(self, domain, html, url, adjustments=None, timeout=None):
+        """Parse and score in a single round trip; returns the parsed fields plus the result."""
+        return self._call(_parse_and_score, domain, html, url, adjustments, timeout=timeout)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None